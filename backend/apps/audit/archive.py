@@ -0,0 +1,95 @@
+"""
+Archival of expired audit logs.
+
+The audit_logs table only keeps the last AUDIT_RETENTION_DAYS days. Older
+entries are exported month by month to gzip-compressed JSON Lines files
+(one entry per line, `audit_logs_YYYY_MM.jsonl.gz` in AUDIT_ARCHIVE_DIR),
+then deleted by indexed created_at ranges, in batches.
+
+Archives are appended to as new gzip members, so re-running a month that
+was interrupted after the export keeps every row (possibly twice, with
+the same id).
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import AuditLog
+
+EXPORT_FIELDS = [
+    'id', 'user_id', 'action', 'entity_type', 'entity_id', 'old_values',
+    'new_values', 'ip_address', 'user_agent', 'created_at'
+]
+
+
+def _month_start(year, month):
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def _next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def retention_cutoff(retention_days=None):
+    """Entries created before the returned datetime are expired."""
+    if retention_days is None:
+        retention_days = getattr(settings, 'AUDIT_RETENTION_DAYS', 365)
+    return timezone.now() - timedelta(days=retention_days)
+
+
+def expired_months(cutoff):
+    """
+    Months holding entries, all of which are older than `cutoff`, oldest first.
+
+    Returns:
+        List of (year, month) tuples
+    """
+    months = AuditLog.objects.filter(created_at__lt=cutoff).datetimes('created_at', 'month')
+    return [
+        (month.year, month.month)
+        for month in months
+        if _month_start(*_next_month(month.year, month.month)) <= cutoff
+    ]
+
+
+def archive_path(directory, year, month):
+    return os.path.join(directory, f'audit_logs_{year}_{month:02d}.jsonl.gz')
+
+
+def archive_month(year, month, directory=None, batch_size=1000, delete=True):
+    """
+    Export one month of audit entries and delete them from the table.
+
+    Returns:
+        Tuple (number of entries archived, archive path)
+    """
+    directory = directory or getattr(settings, 'AUDIT_ARCHIVE_DIR')
+    os.makedirs(directory, exist_ok=True)
+    path = archive_path(directory, year, month)
+
+    month_rows = AuditLog.objects.filter(
+        created_at__gte=_month_start(year, month),
+        created_at__lt=_month_start(*_next_month(year, month))
+    )
+
+    count = 0
+    with gzip.open(path, 'at', encoding='utf-8') as archive:
+        for row in month_rows.order_by('id').values(*EXPORT_FIELDS).iterator(chunk_size=batch_size):
+            archive.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+            archive.write('\n')
+            count += 1
+
+    if delete:
+        while True:
+            ids = list(month_rows.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            AuditLog.objects.filter(id__in=ids).delete()
+
+    return count, path
@@ -0,0 +1,93 @@
+"""
+Request context shared with audit (and any other cross-cutting) code.
+
+The context lives in a ContextVar rather than a thread local: under
+ASGI, sync views run on shared worker threads while several requests are
+in flight, and asgiref copies context variables into those threads, so
+each request, WebSocket message or background job sees its own context.
+
+    with request_context(RequestContext(user=user, source='job')):
+        ...  # log_action() picks up the user from here
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('audit_request_context', default=None)
+
+
+def _client_ip(meta):
+    forwarded = meta.get('HTTP_X_FORWARDED_FOR')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return meta.get('REMOTE_ADDR') or None
+
+
+class RequestContext:
+    """Who is acting, and from where."""
+
+    def __init__(self, user=None, ip_address=None, user_agent='', source='job', request=None):
+        self._user = user
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.source = source
+        self.request = request
+
+    @classmethod
+    def from_request(cls, request):
+        """Context of an HTTP request."""
+        return cls(
+            ip_address=_client_ip(request.META),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            source='http',
+            request=request
+        )
+
+    @classmethod
+    def from_scope(cls, scope):
+        """Context of a WebSocket connection (Channels scope)."""
+        headers = {
+            name.decode('latin1').lower(): value.decode('latin1')
+            for name, value in scope.get('headers', [])
+        }
+        meta = {'HTTP_X_FORWARDED_FOR': headers.get('x-forwarded-for')}
+        if scope.get('client'):
+            meta['REMOTE_ADDR'] = scope['client'][0]
+        return cls(
+            user=scope.get('user'),
+            ip_address=_client_ip(meta),
+            user_agent=headers.get('user-agent', ''),
+            source='websocket'
+        )
+
+    @property
+    def user(self):
+        # DRF authenticates inside the view and sets request.user then, so
+        # the user of an HTTP request is read lazily
+        user = self._user
+        if user is None and self.request is not None:
+            user = getattr(self.request, 'user', None)
+        if user is not None and not user.is_authenticated:
+            return None
+        return user
+
+
+def get_current_context():
+    """Context of the code being run, or None outside of any context."""
+    return _current.get()
+
+
+def get_current_request():
+    """HTTP request being handled, or None."""
+    context = _current.get()
+    return context.request if context is not None else None
+
+
+@contextmanager
+def request_context(context):
+    """Make `context` current for the enclosed block."""
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
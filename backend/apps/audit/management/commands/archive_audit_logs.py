@@ -0,0 +1,65 @@
+"""
+Management command to archive audit logs older than the retention period.
+
+Usage:
+    python manage.py archive_audit_logs
+    python manage.py archive_audit_logs --retention-days 365 --dry-run
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.audit.archive import archive_month, expired_months, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Export expired audit log months to compressed archives and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=None,
+            help='Days kept in the database (default: AUDIT_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=None,
+            help='Archive directory (default: AUDIT_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows read and deleted per batch',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the months that would be archived',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['retention_days'])
+        months = expired_months(cutoff)
+        if not months:
+            self.stdout.write(self.style.SUCCESS('✓ Nothing to archive'))
+            return
+
+        directory = options['output_dir'] or settings.AUDIT_ARCHIVE_DIR
+        for year, month in months:
+            if options['dry_run']:
+                self.stdout.write(f'{year}-{month:02d} would be archived to {directory}')
+                continue
+            started = time.monotonic()
+            count, path = archive_month(
+                year, month, directory=directory, batch_size=options['batch_size']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'✓ {year}-{month:02d}: {count} entries archived to {path} '
+                    f'({time.monotonic() - started:.1f}s)'
+                )
+            )
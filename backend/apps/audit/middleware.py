@@ -2,23 +2,28 @@
 Audit middleware for logging requests.
 """
 
-import threading
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
-_thread_locals = threading.local()
-
-
-def get_current_request():
-    """Get the current request from thread local storage."""
-    return getattr(_thread_locals, 'request', None)
+from .context import RequestContext, get_current_request, request_context  # noqa: F401
 
 
 class AuditMiddleware:
-    """Middleware to store current request for audit logging."""
+    """Middleware to make the current request available for audit logging."""
+
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        _thread_locals.request = request
-        response = self.get_response(request)
-        return response
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_context(RequestContext.from_request(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_context(RequestContext.from_request(request)):
+            return await self.get_response(request)
@@ -4,12 +4,14 @@ Audit log model for tracking user actions.
 
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
     """
     Audit log for tracking all significant user actions.
-    Stored for 1 year for RGPD compliance.
+    Stored for 1 year for RGPD compliance: older months are exported to
+    compressed archives and removed by `manage.py archive_audit_logs`.
     """
 
     class Action(models.TextChoices):
@@ -58,13 +60,18 @@ class AuditLog(models.Model):
         blank=True,
         verbose_name='User Agent'
     )
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date')
+    # Set when the action happens, not when the buffered row is written
+    created_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Date')
 
     class Meta:
         db_table = 'audit_logs'
         verbose_name = 'Log d\'audit'
         verbose_name_plural = 'Logs d\'audit'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='audit_created_at_idx'),
+            models.Index(fields=['entity_type', 'created_at'], name='audit_entity_created_idx'),
+        ]
 
     def __str__(self):
         user_name = self.user.username if self.user else 'Système'
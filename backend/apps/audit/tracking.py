@@ -0,0 +1,261 @@
+"""
+Automatic field-level change capture for audited models.
+
+Models opt in with the `@audited` decorator:
+
+    @audited(exclude=['updated_at'], critical=['payment_status'])
+    class Order(models.Model):
+        objects = AuditedManager()
+
+- Field values are snapshotted in memory when an instance is loaded
+  (post_init), so saving computes the diff without re-reading the row.
+- post_save / post_delete record create, update and delete entries with
+  the changed fields only.
+- AuditedManager makes `update()`, `bulk_create()` and `bulk_update()`
+  record one entry per affected row. `update()` reads the previous values
+  of the updated fields once, for all rows.
+
+Entries go through the buffered writer (see writer.py); changes touching
+a `critical` field are written synchronously.
+"""
+
+import datetime
+import decimal
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models, transaction
+from django.db.models.expressions import Combinable
+from django.db.models.signals import post_init, post_save, post_delete
+
+from .models import AuditLog
+from .writer import log_action
+
+MASK = '***'
+_registry = {}
+_suspended = ContextVar('audit_tracking_suspended', default=False)
+
+
+class AuditSpec:
+    """What is audited on one model."""
+
+    def __init__(self, model, exclude=(), masked=(), critical=()):
+        self.model = model
+        self.entity_type = model.__name__
+        self.masked = set(masked)
+        self.critical = set(critical)
+        self.fields = {
+            field.attname: field.name
+            for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in exclude
+        }
+
+    def tracks(self, name):
+        return name in self.fields or name in self.fields.values()
+
+    def attname(self, name):
+        """Attribute name of a field given by name or attname."""
+        if name in self.fields:
+            return name
+        for attname, field_name in self.fields.items():
+            if field_name == name:
+                return attname
+        return None
+
+    def value(self, attname, value):
+        if self.fields[attname] in self.masked:
+            return MASK
+        return _json_value(value)
+
+    def is_critical(self, attnames):
+        return any(self.fields[attname] in self.critical for attname in attnames)
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def get_spec(model):
+    if _suspended.get():
+        return None
+    return _registry.get(model)
+
+
+@contextmanager
+def suspended():
+    """Disable change capture in the enclosed block (purges, migrations...)."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def snapshot(instance, spec):
+    """Current values of the tracked fields loaded on the instance."""
+    values = instance.__dict__
+    return {attname: values[attname] for attname in spec.fields if attname in values}
+
+
+def changed_fields(instance):
+    """
+    Names of the tracked fields changed since the instance was loaded or
+    last saved, or None when the instance carries no snapshot.
+    """
+    before = getattr(instance, '_audit_snapshot', None)
+    spec = _registry.get(type(instance))
+    if before is None or spec is None:
+        return None
+    return [
+        spec.fields[attname] for attname, value in snapshot(instance, spec).items()
+        if attname in before and before[attname] != value
+    ]
+
+
+def _record(spec, action, pk, old_values=None, new_values=None, changed=()):
+    log_action(
+        None,
+        action,
+        spec.entity_type,
+        pk,
+        old_values=old_values,
+        new_values=new_values,
+        critical=spec.is_critical(changed)
+    )
+
+
+def record_changes(spec, pk, before, after):
+    """Record an update entry for the fields that differ, if any."""
+    changed = [
+        attname for attname, value in after.items()
+        if attname in before and before[attname] != value
+    ]
+    if not changed:
+        return
+    _record(
+        spec, AuditLog.Action.UPDATE, pk,
+        old_values={spec.fields[a]: spec.value(a, before[a]) for a in changed},
+        new_values={spec.fields[a]: spec.value(a, after[a]) for a in changed},
+        changed=changed
+    )
+
+
+def record_creation(spec, instance):
+    values = snapshot(instance, spec)
+    _record(
+        spec, AuditLog.Action.CREATE, instance.pk,
+        new_values={spec.fields[a]: spec.value(a, v) for a, v in values.items()},
+        changed=values.keys()
+    )
+
+
+def _on_init(sender, instance, **kwargs):
+    instance._audit_snapshot = snapshot(instance, _registry[sender])
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    spec = get_spec(sender)
+    if raw or spec is None:
+        return
+    if created:
+        record_creation(spec, instance)
+    else:
+        record_changes(spec, instance.pk, getattr(instance, '_audit_snapshot', {}),
+                       snapshot(instance, spec))
+    instance._audit_snapshot = snapshot(instance, spec)
+
+
+def _on_delete(sender, instance, **kwargs):
+    spec = get_spec(sender)
+    if spec is None:
+        return
+    values = getattr(instance, '_audit_snapshot', None) or snapshot(instance, spec)
+    _record(
+        spec, AuditLog.Action.DELETE, instance.pk,
+        old_values={spec.fields[a]: spec.value(a, v) for a, v in values.items()},
+        changed=values.keys()
+    )
+
+
+def audited(exclude=(), masked=(), critical=()):
+    """
+    Class decorator registering a model for change capture.
+
+    Args:
+        exclude: Fields never recorded (timestamps, caches...)
+        masked: Fields recorded as changed without their values
+        critical: Fields whose changes are written synchronously
+    """
+    def register(model):
+        _registry[model] = AuditSpec(model, exclude, masked, critical)
+        post_init.connect(_on_init, sender=model, weak=False)
+        post_save.connect(_on_save, sender=model, weak=False)
+        post_delete.connect(_on_delete, sender=model, weak=False)
+        return model
+    return register
+
+
+class AuditedQuerySet(models.QuerySet):
+    """QuerySet recording bulk operations of audited models."""
+
+    def update(self, **kwargs):
+        spec = get_spec(self.model)
+        attnames = [spec.attname(name) for name in kwargs if spec and spec.tracks(name)]
+        if not attnames:
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            before = {
+                row.pop('pk'): row
+                for row in self.values('pk', *attnames)
+            }
+            count = super().update(**kwargs)
+            if any(isinstance(value, Combinable) for value in kwargs.values()):
+                # Expressions (F('stock') - 1...): read the resulting values
+                after = {
+                    row.pop('pk'): row
+                    for row in self.model._base_manager.using(self.db).filter(
+                        pk__in=list(before)
+                    ).values('pk', *attnames)
+                }
+            else:
+                new = {
+                    spec.attname(name): value.pk if isinstance(value, models.Model) else value
+                    for name, value in kwargs.items() if spec.tracks(name)
+                }
+                after = {pk: new for pk in before}
+            for pk, old in before.items():
+                record_changes(spec, pk, old, after.get(pk, {}))
+        return count
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        spec = get_spec(self.model)
+        if spec is not None:
+            for obj in objs:
+                record_creation(spec, obj)
+                obj._audit_snapshot = snapshot(obj, spec)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        spec = get_spec(self.model)
+        # bulk_update() runs update() queries itself: record from snapshots only
+        with suspended():
+            count = super().bulk_update(objs, fields, *args, **kwargs)
+        if spec is not None:
+            attnames = [spec.attname(name) for name in fields if spec.tracks(name)]
+            for obj in objs:
+                before = getattr(obj, '_audit_snapshot', {})
+                after = {a: obj.__dict__[a] for a in attnames if a in obj.__dict__}
+                record_changes(spec, obj.pk, before, after)
+                obj._audit_snapshot = snapshot(obj, spec)
+        return count
+
+
+class AuditedManager(models.Manager.from_queryset(AuditedQuerySet)):
+    """Default manager of audited models."""
@@ -2,6 +2,10 @@
 Views for AuditLog.
 """
 
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
@@ -12,6 +16,14 @@ from .serializers import AuditLogSerializer
 from apps.users.permissions import IsAdmin
 
 
+def _day_start(value):
+    """Aware datetime at the start of a YYYY-MM-DD day, or None."""
+    day = parse_date(value or '')
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing audit logs (admin only)."""
     queryset = AuditLog.objects.select_related('user')
@@ -25,12 +37,12 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
 
-        # Filter by date range
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date)
+        # Filter by date range, as created_at ranges so the index is used
+        start = _day_start(self.request.query_params.get('start_date'))
+        end = _day_start(self.request.query_params.get('end_date'))
+        if start:
+            queryset = queryset.filter(created_at__gte=start)
+        if end:
+            queryset = queryset.filter(created_at__lt=end + timedelta(days=1))
 
         return queryset
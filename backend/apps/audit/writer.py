@@ -0,0 +1,134 @@
+"""
+Buffered audit log writer.
+
+`log_action()` does not insert anything in the request path: entries are
+buffered per process and written with one `bulk_create` by a background
+thread, when AUDIT_BUFFER_SIZE entries are waiting or every
+AUDIT_FLUSH_INTERVAL seconds, and at interpreter exit.
+
+Entries are buffered only once the surrounding transaction commits, so a
+rolled back change leaves no audit trace. Critical entries (e.g. payment
+changes) are written synchronously, in the caller's transaction. The
+user, IP address and user agent default to the current request context
+(see context.py).
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .context import RequestContext, get_current_context
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, f'AUDIT_{name}', default)
+
+
+class AuditWriter:
+    """Per-process buffer of AuditLog rows flushed by a daemon thread."""
+
+    def __init__(self):
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, entry):
+        with self._lock:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= _setting('BUFFER_SIZE', 100)
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every buffered entry. Returns the number of rows written."""
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(entries, batch_size=500)
+        except Exception:
+            logger.exception('Audit bulk insert failed, writing %s entries one by one', len(entries))
+            for entry in entries:
+                try:
+                    entry.save()
+                except Exception:
+                    logger.exception('Audit entry lost: %s', entry.__dict__)
+        return len(entries)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(timeout=_setting('FLUSH_INTERVAL', 2))
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Audit flush failed')
+            finally:
+                connections.close_all()
+
+
+writer = AuditWriter()
+
+
+def log_action(user, action, entity_type, entity_id='', old_values=None, new_values=None,
+               request=None, critical=False):
+    """
+    Record an audit entry.
+
+    Args:
+        user: User performing the action (defaults to the context's user)
+        action: AuditLog.Action value
+        entity_type: Model name, e.g. 'Order'
+        entity_id: Primary key of the entity
+        old_values: Dict of previous values
+        new_values: Dict of new values
+        request: Request the IP address and user agent are read from
+            (defaults to the current request context)
+        critical: Write synchronously instead of buffering
+
+    Returns:
+        The AuditLog instance (unsaved until flushed unless critical)
+    """
+    context = RequestContext.from_request(request) if request is not None else get_current_context()
+    if user is None and context is not None:
+        user = context.user
+
+    entry = AuditLog(
+        user=user if user is not None and user.is_authenticated else None,
+        action=action,
+        entity_type=entity_type,
+        entity_id=str(entity_id),
+        old_values=old_values,
+        new_values=new_values,
+        created_at=timezone.now()
+    )
+    if context is not None:
+        entry.ip_address = context.ip_address
+        entry.user_agent = context.user_agent
+
+    if critical or not _setting('ASYNC', True):
+        entry.save()
+    else:
+        transaction.on_commit(lambda: writer.add(entry))
+    return entry
@@ -0,0 +1,20 @@
+"""
+Admin configuration for Client model.
+"""
+
+from django.contrib import admin
+from .models import Client
+
+
+@admin.register(Client)
+class ClientAdmin(admin.ModelAdmin):
+    list_display = [
+        'name', 'phone', 'orders_count', 'sales_count',
+        'lifetime_value', 'outstanding_credit', 'last_order_at'
+    ]
+    search_fields = ['name', 'phone', 'phone_key']
+    readonly_fields = [
+        'phone_key', 'orders_count', 'sales_count', 'lifetime_value',
+        'outstanding_credit', 'last_order_at', 'created_at', 'updated_at'
+    ]
+    ordering = ['name']
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:35
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Client',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_key', models.CharField(max_length=20, unique=True, verbose_name='Téléphone normalisé')),
+                ('name', models.CharField(max_length=200, verbose_name='Nom')),
+                ('phone', models.CharField(max_length=20, verbose_name='Téléphone')),
+                ('search_name', models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='Nom normalisé')),
+                ('orders_count', models.PositiveIntegerField(default=0, verbose_name='Commandes')),
+                ('sales_count', models.PositiveIntegerField(default=0, verbose_name='Ventes')),
+                ('lifetime_value', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=14, verbose_name="Chiffre d'affaires (FCFA)")),
+                ('outstanding_credit', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=14, verbose_name='Crédit en cours (FCFA)')),
+                ('last_order_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernier achat')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Client',
+                'verbose_name_plural': 'Clients',
+                'db_table': 'clients',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['-lifetime_value'], name='client_value_idx'), models.Index(condition=models.Q(('outstanding_credit__gt', 0)), fields=['-outstanding_credit'], name='client_credit_idx')],
+            },
+        ),
+    ]
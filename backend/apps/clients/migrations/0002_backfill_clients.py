@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from apps.clients.services import backfill
+
+
+def backfill_clients(apps, schema_editor):
+    backfill(
+        apps.get_model('clients', 'Client'),
+        apps.get_model('orders', 'Order'),
+        apps.get_model('sales', 'Sale'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+        ('orders', '0006_client'),
+        ('sales', '0003_client'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_clients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from utils.search import postgres_search_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_backfill_clients'),
+    ]
+
+    operations = [
+        postgres_search_indexes('clients', ['search_name'], ['phone_key']),
+    ]
@@ -0,0 +1,86 @@
+"""
+Client model derived from orders and sales.
+"""
+
+from decimal import Decimal
+
+from django.db import models
+
+
+class Client(models.Model):
+    """
+    Client identified by a normalized phone number.
+
+    Orders and sales carrying the same phone number (see
+    utils.search.normalize_phone) are linked to one client. The aggregates
+    are kept up to date as orders and sales are saved (see services.py),
+    so client pages and credit checks read a single row.
+    """
+
+    phone_key = models.CharField(
+        max_length=20,
+        unique=True,
+        verbose_name='Téléphone normalisé'
+    )
+    name = models.CharField(
+        max_length=200,
+        verbose_name='Nom'
+    )
+    phone = models.CharField(
+        max_length=20,
+        verbose_name='Téléphone'
+    )
+    search_name = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Nom normalisé'
+    )
+
+    # Aggregates
+    orders_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Commandes'
+    )
+    sales_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ventes'
+    )
+    lifetime_value = models.DecimalField(
+        max_digits=14,
+        decimal_places=0,
+        default=Decimal('0'),
+        verbose_name='Chiffre d\'affaires (FCFA)'
+    )
+    outstanding_credit = models.DecimalField(
+        max_digits=14,
+        decimal_places=0,
+        default=Decimal('0'),
+        verbose_name='Crédit en cours (FCFA)'
+    )
+    last_order_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Dernier achat'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Créé le')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Modifié le')
+
+    class Meta:
+        db_table = 'clients'
+        verbose_name = 'Client'
+        verbose_name_plural = 'Clients'
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['-lifetime_value'], name='client_value_idx'),
+            models.Index(
+                fields=['-outstanding_credit'],
+                name='client_credit_idx',
+                condition=models.Q(outstanding_credit__gt=0)
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.phone})"
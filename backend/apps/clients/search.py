@@ -0,0 +1,104 @@
+"""
+Client autocomplete (see utils.search).
+
+Served from the Client table (one row per phone number, see models.py),
+ranked by the client's number of orders and sales. Orders and sales keep
+normalized keys of their client fields, set on save by
+`update_client_keys()`; the phone key links them to their client.
+
+The in-memory index used on SQLite follows a version bumped when a
+client is created or renamed.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+
+from utils.search import (
+    PrefixIndex, get_prefix_index, is_phone_query, normalize_phone, normalize_text,
+    use_database_index, word_prefix_filter
+)
+
+from .models import Client
+
+CLIENT_FIELDS = {'client_name', 'client_phone'}
+VERSION_KEY = 'search:clients:version'
+
+
+def clients_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def clients_changed():
+    """Make the client index stale once the current transaction commits."""
+    transaction.on_commit(_bump_version)
+
+
+def update_client_keys(instance, save_kwargs):
+    """
+    Refresh the client search keys of an order or sale about to be saved.
+
+    Adds the keys and the client link (see signals.py) to `update_fields`
+    when client fields are saved.
+    """
+    instance.client_search_name = normalize_text(instance.client_name)
+    instance.client_phone_key = normalize_phone(instance.client_phone)
+
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None and CLIENT_FIELDS & set(update_fields):
+        save_kwargs['update_fields'] = {
+            *update_fields, 'client_search_name', 'client_phone_key', 'client'
+        }
+
+
+def _with_count(queryset):
+    return queryset.annotate(count=F('orders_count') + F('sales_count'))
+
+
+def _build_index():
+    index = PrefixIndex()
+    rows = _with_count(Client.objects.all()).values_list(
+        'search_name', 'phone_key', 'name', 'phone', 'count'
+    )
+    for name_key, phone_key, name, phone, count in rows:
+        index.add((name, phone, count), f'{name_key} {phone_key}'.strip(), weight=count)
+    return index
+
+
+def _search_database(query, limit):
+    if is_phone_query(query):
+        condition = Q(phone_key__startswith=normalize_phone(query))
+        starts = Value(1)
+    else:
+        key = normalize_text(query)
+        condition = word_prefix_filter('search_name', query)
+        starts = Case(When(search_name__startswith=key, then=Value(0)), default=Value(1))
+    return list(
+        _with_count(Client.objects.filter(condition))
+        .annotate(starts=starts)
+        .order_by('starts', '-count', 'search_name')
+        .values_list('name', 'phone', 'count')[:limit]
+    )
+
+
+def search_clients(query, limit):
+    """
+    Clients matching a name or phone prefix.
+
+    Returns:
+        List of dicts with name, phone and the number of orders and sales
+    """
+    if use_database_index():
+        results = _search_database(query, limit)
+    else:
+        index = get_prefix_index('clients', clients_version(), _build_index)
+        key = normalize_phone(query) if is_phone_query(query) else normalize_text(query)
+        results = index.search(key, limit)
+    return [{'name': name, 'phone': phone, 'count': count} for name, phone, count in results]
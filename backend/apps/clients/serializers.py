@@ -0,0 +1,19 @@
+"""
+Serializers for Client model.
+"""
+
+from rest_framework import serializers
+from .models import Client
+
+
+class ClientSerializer(serializers.ModelSerializer):
+    """Read-only client with its aggregates."""
+
+    class Meta:
+        model = Client
+        fields = [
+            'id', 'name', 'phone', 'orders_count', 'sales_count',
+            'lifetime_value', 'outstanding_credit', 'last_order_at',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
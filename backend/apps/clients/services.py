@@ -0,0 +1,133 @@
+"""
+Client resolution and aggregates.
+
+The aggregates of a client are recomputed from its orders and sales (two
+grouped queries over the client foreign keys) whenever one of them is
+saved with a relevant change, rather than adjusted by deltas, so status,
+payment and total changes can never make them drift.
+
+- orders_count: orders not cancelled
+- sales_count: sales
+- lifetime_value: delivered orders + sales
+- outstanding_credit: unpaid orders not cancelled + amounts due on sales
+- last_order_at: latest order (not cancelled) or sale
+
+The functions take the models as arguments so the data migration can run
+them with historical models.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, Max, Q, Sum
+
+from utils.search import normalize_text
+
+from .search import clients_changed
+
+# Order/Sale choices, as stored (the migration has no access to the enums)
+DELIVERED = 'livree'
+CANCELLED = 'annulee'
+UNPAID = 'non_payee'
+
+
+def _order_aggregates(Order, client_ids):
+    active = ~Q(delivery_status=CANCELLED)
+    return Order.objects.filter(client_id__in=client_ids).values('client_id').annotate(
+        count=Count('id', filter=active),
+        value=Sum('total_price', filter=Q(delivery_status=DELIVERED)),
+        credit=Sum('total_price', filter=active & Q(payment_status=UNPAID)),
+        last=Max('created_at', filter=active),
+    )
+
+
+def _sale_aggregates(Sale, client_ids):
+    return Sale.objects.filter(client_id__in=client_ids).values('client_id').annotate(
+        count=Count('id'),
+        value=Sum('total_amount'),
+        credit=Sum('amount_due'),
+        last=Max('created_at'),
+    )
+
+
+def update_aggregates(client_ids, Client, Order, Sale):
+    """Recompute the aggregates of the given clients."""
+    client_ids = [client_id for client_id in set(client_ids) if client_id]
+    if not client_ids:
+        return
+    totals = {
+        client_id: {
+            'orders_count': 0, 'sales_count': 0, 'lifetime_value': Decimal('0'),
+            'outstanding_credit': Decimal('0'), 'last_order_at': None,
+        }
+        for client_id in client_ids
+    }
+    for rows, count_field in (
+        (_order_aggregates(Order, client_ids), 'orders_count'),
+        (_sale_aggregates(Sale, client_ids), 'sales_count'),
+    ):
+        for row in rows:
+            total = totals[row['client_id']]
+            total[count_field] = row['count']
+            total['lifetime_value'] += row['value'] or 0
+            total['outstanding_credit'] += max(row['credit'] or 0, 0)
+            if row['last'] and (total['last_order_at'] is None or row['last'] > total['last_order_at']):
+                total['last_order_at'] = row['last']
+
+    clients = list(Client.objects.filter(id__in=client_ids))
+    for client in clients:
+        for field, value in totals[client.id].items():
+            setattr(client, field, value)
+    Client.objects.bulk_update(clients, list(next(iter(totals.values()))), batch_size=500)
+
+
+def resolve_client(Client, phone_key, name, phone):
+    """Client of a phone number, created or renamed after the latest order."""
+    client, created = Client.objects.get_or_create(
+        phone_key=phone_key,
+        defaults={'name': name, 'phone': phone, 'search_name': normalize_text(name)}
+    )
+    if created:
+        clients_changed()
+    elif name and (client.name != name or client.phone != phone):
+        client.name = name
+        client.phone = phone
+        client.search_name = normalize_text(name)
+        client.save(update_fields=['name', 'phone', 'search_name', 'updated_at'])
+        clients_changed()
+    return client
+
+
+def backfill(Client, Order, Sale):
+    """Create clients from existing orders and sales and link them."""
+    latest = {}
+    for model in (Order, Sale):
+        rows = model.objects.exclude(client_phone_key='').order_by('created_at').values_list(
+            'client_phone_key', 'client_name', 'client_phone', 'created_at'
+        )
+        for phone_key, name, phone, created_at in rows:
+            if phone_key not in latest or created_at >= latest[phone_key][2]:
+                latest[phone_key] = (name, phone, created_at)
+
+    existing = set(Client.objects.values_list('phone_key', flat=True))
+    Client.objects.bulk_create([
+        Client(phone_key=key, name=name, phone=phone, search_name=normalize_text(name))
+        for key, (name, phone, _) in latest.items()
+        if key not in existing
+    ], batch_size=500)
+
+    ids = dict(Client.objects.values_list('phone_key', 'id'))
+    for model in (Order, Sale):
+        for phone_key, client_id in ids.items():
+            model.objects.filter(client_phone_key=phone_key).update(client_id=client_id)
+
+    client_ids = list(ids.values())
+    for start in range(0, len(client_ids), 500):
+        update_aggregates(client_ids[start:start + 500], Client, Order, Sale)
+
+
+def refresh_clients(client_ids):
+    """Recompute the aggregates of clients after their orders or sales changed."""
+    from apps.orders.models import Order
+    from apps.sales.models import Sale
+    from .models import Client
+    update_aggregates(client_ids, Client, Order, Sale)
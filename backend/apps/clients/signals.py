@@ -0,0 +1,61 @@
+"""
+Signals linking orders and sales to clients.
+Keeps the client of each order/sale and the client aggregates up to date.
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.audit.tracking import changed_fields
+from apps.orders.models import Order
+from apps.sales.models import Sale
+
+from .models import Client
+from .services import refresh_clients, resolve_client
+
+CLIENT_FIELDS = {'client_name', 'client_phone'}
+
+# Fields the client aggregates depend on
+AGGREGATE_FIELDS = {
+    Order: {'delivery_status', 'payment_status', 'total_price'},
+    Sale: {'payment_status', 'total_amount', 'amount_due'},
+}
+
+
+@receiver(pre_save, sender=Order)
+@receiver(pre_save, sender=Sale)
+def link_client(sender, instance, update_fields=None, **kwargs):
+    """Set the client from the phone number when it changed."""
+    changed = None if instance._state.adding else changed_fields(instance)
+    previous_client_id = instance.client_id
+
+    client_fields_saved = update_fields is None or CLIENT_FIELDS & set(update_fields)
+    if client_fields_saved and (
+        changed is None or CLIENT_FIELDS & set(changed)
+        or (instance.client_id is None and instance.client_phone_key)
+    ):
+        if instance.client_phone_key:
+            instance.client = resolve_client(
+                Client, instance.client_phone_key, instance.client_name, instance.client_phone
+            )
+        else:
+            instance.client = None
+
+    instance._client_ids_to_refresh = set()
+    if changed is None or AGGREGATE_FIELDS[sender] & set(changed) \
+            or instance.client_id != previous_client_id:
+        instance._client_ids_to_refresh = {previous_client_id, instance.client_id}
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=Sale)
+def refresh_client_aggregates(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_clients(getattr(instance, '_client_ids_to_refresh', {instance.client_id}))
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=Sale)
+def refresh_client_after_delete(sender, instance, **kwargs):
+    refresh_clients([instance.client_id])
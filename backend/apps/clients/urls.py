@@ -0,0 +1,11 @@
+"""
+URL routes for clients.
+"""
+
+from rest_framework.routers import DefaultRouter
+from .views import ClientViewSet
+
+router = DefaultRouter()
+router.register('', ClientViewSet, basename='client')
+
+urlpatterns = router.urls
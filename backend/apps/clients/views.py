@@ -0,0 +1,68 @@
+"""
+Views for the client directory.
+"""
+
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.orders.serializers import OrderListSerializer
+from apps.sales.serializers import SaleListSerializer
+from utils.search import is_phone_query, normalize_phone, word_prefix_filter
+
+from .models import Client
+from .serializers import ClientSerializer
+
+
+class ClientViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Client directory (read-only, maintained from orders and sales).
+
+    - ?search= matches name words or the start of the phone number
+    - ?has_credit=true keeps clients with outstanding credit
+    - ?ordering=-lifetime_value lists the top clients
+    """
+    serializer_class = ClientSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['name', 'lifetime_value', 'outstanding_credit', 'last_order_at', 'orders_count']
+    ordering = ['name']
+
+    def get_queryset(self):
+        queryset = Client.objects.all()
+
+        search = self.request.query_params.get('search', '').strip()
+        if search:
+            if is_phone_query(search):
+                queryset = queryset.filter(phone_key__startswith=normalize_phone(search))
+            else:
+                queryset = queryset.filter(word_prefix_filter('search_name', search))
+
+        if self.request.query_params.get('has_credit') == 'true':
+            queryset = queryset.filter(outstanding_credit__gt=0)
+
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def orders(self, request, pk=None):
+        """Orders of the client, most recent first."""
+        client = self.get_object()
+        orders = client.orders.select_related('created_by').order_by('-created_at')
+        page = self.paginate_queryset(orders)
+        serializer = OrderListSerializer(page if page is not None else orders, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def sales(self, request, pk=None):
+        """Sales of the client, most recent first."""
+        client = self.get_object()
+        sales = client.sales.select_related('created_by').order_by('-created_at')
+        page = self.paginate_queryset(sales)
+        serializer = SaleListSerializer(page if page is not None else sales, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
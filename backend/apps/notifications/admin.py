@@ -3,12 +3,20 @@ Admin configuration for Notification model.
 """
 
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, OutboxMessage
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['title', 'type', 'recipient_role', 'user', 'is_read', 'created_at']
-    list_filter = ['type', 'is_read', 'recipient_role', 'created_at']
+    list_display = ['title', 'type', 'recipient_role', 'user', 'created_at']
+    list_filter = ['type', 'recipient_role', 'created_at']
     search_fields = ['title', 'message']
     ordering = ['-created_at']
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['event_type', 'groups', 'status', 'attempts', 'next_attempt_at', 'created_at']
+    list_filter = ['status', 'event_type']
+    search_fields = ['last_error']
+    ordering = ['id']
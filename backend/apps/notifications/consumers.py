@@ -2,9 +2,23 @@
 WebSocket consumers for real-time notifications.
 """
 
+import asyncio
 import json
+import logging
+from collections import Counter
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
+
+from apps.audit.context import RequestContext, request_context
+from . import metrics, replay
+from .flow_control import TransportFlow
+from .send_queue import SendQueue
+from .topics import Subscriptions
+
+logger = logging.getLogger(__name__)
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -18,6 +32,26 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     This allows sending notifications to:
     - Specific users
     - All users with a specific role
+
+    Every event carries the `group` it was published to and its `seq`
+    number in that group. A client reconnecting with
+    `?last_seq=user_3:12,role_admin:40` (or sending a `resume` action) is
+    replayed the events it missed, or told to refresh with a
+    `resync_required` frame when they are no longer buffered.
+
+    Clients can narrow order and stock events with the `subscribe` and
+    `unsubscribe` actions, or with `?topics=orders.priority:haute,...` so
+    that the replay is filtered too (see topics.py); filtering happens
+    here, before anything is sent. An event whose items are all filtered
+    out is sent as a bare `seq` frame, so the client's sequence numbers
+    keep up with ours.
+
+    Outbound frames go through a bounded SendQueue drained by a writer
+    task, which waits while the transport's write buffer is full (see
+    flow_control.py), so a slow client fills the queue instead of the
+    server's memory. On overflow the queue is dropped and the client gets
+    `resync_required`; gaps in sequence numbers (messages dropped by the
+    channel layer at capacity) are filled from the replay buffer.
     """
 
     async def connect(self):
@@ -41,16 +75,48 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
+        # Last sequence number delivered per group, to drop live events
+        # that were already replayed
+        self.last_seq = {}
+        self.subscriptions = Subscriptions()
+
+        self.stats = metrics.new_stats()
+        self.stats['connections'] = 1
+        self.send_queue = SendQueue(
+            getattr(settings, 'NOTIFICATION_WS_QUEUE_SIZE', 100), self.stats
+        )
+        self._queue_ready = asyncio.Event()
+
         await self.accept()
 
+        self.flow = TransportFlow(self.base_send, self.stats)
+        self._writer = asyncio.ensure_future(self._drain_queue())
+
         # Send initial unread count
         unread_count = await self.get_unread_count()
         await self.send(text_data=json.dumps({
             'type': 'init',
-            'unread_count': unread_count
+            'unread_count': unread_count,
+            'seq': await self.get_sequences()
         }))
 
+        query_params = parse_qs(self.scope.get('query_string', b'').decode())
+        topics = query_params.get('topics', [None])[0]
+        if topics:
+            await self.update_subscriptions(
+                self.subscriptions.subscribe, topics.split(',')
+            )
+
+        # Replay missed events before any live event is handled
+        last_seq = query_params.get('last_seq', [None])[0]
+        if last_seq:
+            await self.resume(self._parse_last_seq(last_seq))
+
     async def disconnect(self, close_code):
+        if hasattr(self, '_writer'):
+            self._writer.cancel()
+            self.flow.close()
+            await self.flush_metrics()
         if hasattr(self, 'user_group'):
             await self.channel_layer.group_discard(
                 self.user_group,
@@ -64,71 +130,291 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         """Handle incoming WebSocket messages."""
+        with request_context(RequestContext.from_scope(self.scope)):
+            await self._handle_action(text_data)
+
+    async def _handle_action(self, text_data):
         try:
             data = json.loads(text_data)
-            action = data.get('action')
+        except json.JSONDecodeError:
+            await self._send_error('Message JSON invalide')
+            return
+        if not isinstance(data, dict):
+            await self._send_error('Le message doit être un objet JSON')
+            return
+        action = data.get('action')
 
-            if action == 'mark_read':
-                notification_id = data.get('notification_id')
-                await self.mark_notification_read(notification_id)
+        if action == 'mark_read':
+            notification_id = self._parse_id(data.get('notification_id'))
+            if notification_id is None:
+                await self._send_error('Identifiant de notification invalide')
+                return
+            await self.mark_notification_read(notification_id)
 
-            elif action == 'mark_all_read':
-                await self.mark_all_read()
+        elif action == 'mark_all_read':
+            await self.mark_all_read()
 
-            elif action == 'get_unread_count':
-                count = await self.get_unread_count()
-                await self.send(text_data=json.dumps({
-                    'type': 'unread_count',
-                    'count': count
-                }))
+        elif action in ('subscribe', 'unsubscribe'):
+            topics = data.get('topics')
+            if isinstance(topics, str):
+                topics = [topics]
+            if not (topics is None or isinstance(topics, list)
+                    and all(isinstance(topic, str) for topic in topics)):
+                await self._send_error('Les sujets doivent être une liste de chaînes')
+                return
+            if action == 'subscribe':
+                await self.update_subscriptions(self.subscriptions.subscribe, topics or [])
+            else:
+                await self.update_subscriptions(self.subscriptions.unsubscribe, topics)
 
-        except json.JSONDecodeError:
-            pass
+        elif action == 'resume':
+            last_seq = data.get('last_seq') or {}
+            if isinstance(last_seq, str):
+                last_seq = self._parse_last_seq(last_seq)
+            if not isinstance(last_seq, dict):
+                await self._send_error('last_seq doit associer chaque groupe à une séquence')
+                return
+            await self.resume(last_seq)
 
-    async def notification_message(self, event):
-        """Send notification to WebSocket."""
+        elif action == 'get_stats':
+            await self.send(text_data=json.dumps({'type': 'stats', **self.stats}))
+
+        elif action == 'get_unread_count':
+            count = await self.get_unread_count()
+            await self.send(text_data=json.dumps({
+                'type': 'unread_count',
+                'count': count
+            }))
+
+    async def _send_error(self, message):
         await self.send(text_data=json.dumps({
-            'type': 'notification',
-            'data': event['data']
+            'type': 'error',
+            'message': message
         }))
 
-    async def order_update(self, event):
-        """Send order update to WebSocket."""
+    @staticmethod
+    def _parse_id(value):
+        """Positive integer id from a JSON value, None if it is not one."""
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        return value if isinstance(value, int) and value > 0 else None
+
+    async def update_subscriptions(self, update, topics):
+        """Apply a subscription change and send back the current topics."""
+        try:
+            update(topics)
+        except ValueError as e:
+            await self._send_error(f'Sujet inconnu: {e}')
+            return
         await self.send(text_data=json.dumps({
-            'type': 'order_update',
-            'data': event['data']
+            'type': 'subscriptions',
+            'topics': self.subscriptions.as_list()
         }))
 
+    @staticmethod
+    def _parse_last_seq(value):
+        """Parse `group:seq,group:seq` into a dict."""
+        last_seq = {}
+        for part in value.split(','):
+            group, _, seq = part.rpartition(':')
+            if group and seq.isdigit():
+                last_seq[group] = int(seq)
+        return last_seq
+
+    async def resume(self, last_seq):
+        """Replay the events published after `last_seq` to our groups."""
+        for group in (self.user_group, self.role_group):
+            if group not in last_seq:
+                continue
+            try:
+                seq = int(last_seq[group])
+            except (TypeError, ValueError):
+                continue
+
+            await self._replay(group, seq)
+
+    async def _replay(self, group, seq):
+        """Send the events of `group` after `seq`, or ask for a resync."""
+        events = await self.get_events_since(group, seq)
+        if events is None:
+            await self._resync([group])
+            return
+
+        self.last_seq[group] = max(seq, self.last_seq.get(group, 0))
+        for event in events:
+            await self.dispatch(event)
+
+    async def _resync(self, groups):
+        """
+        Tell the client to refetch; live events continue from now on.
+
+        The frame carries the group's current `seq`, which replaces the
+        client's position in that group (it may be ahead of ours after a
+        cache flush).
+        """
+        for group in groups:
+            self.last_seq[group] = await self.get_sequence(group)
+            self.stats['resyncs'] += 1
+            await self.send(text_data=json.dumps({
+                'type': 'resync_required',
+                'group': group,
+                'seq': self.last_seq[group]
+            }))
+
+    async def _is_new(self, event):
+        """
+        Track the event's sequence number; False if already delivered.
+
+        A jump in sequence numbers means the channel layer dropped events
+        for this connection: they are replayed first (including this one).
+        """
+        group, seq = event.get('group'), event.get('seq')
+        if group is None or seq is None:
+            return True
+        last = self.last_seq.get(group)
+        if last is not None and seq <= last:
+            return False
+        if last is not None and seq > last + 1:
+            self.stats['gaps'] += 1
+            await self._replay(group, last)
+            return False
+        self.last_seq[group] = seq
+        return True
+
+    async def _queue_frame(self, frame):
+        """Queue a frame for the writer task, resyncing on overflow."""
+        if self.send_queue.push(frame):
+            self._queue_ready.set()
+            return
+        logger.warning(
+            'WebSocket send queue full for user %s, %s frames dropped',
+            self.user.id, self.stats['dropped']
+        )
+        await self._resync([self.user_group, self.role_group])
+        await self.flush_metrics()
+
+    async def _drain_queue(self):
+        """Writer task: send queued frames in order, as the transport allows."""
+        while True:
+            await self._queue_ready.wait()
+            self._queue_ready.clear()
+            while self.send_queue:
+                await self.flow.writable.wait()
+                if not self.send_queue:
+                    # Dropped for a resync while waiting
+                    break
+                await self.send(text_data=json.dumps(self.send_queue.pop()))
+                self.stats['sent'] += 1
+
+    @staticmethod
+    def _sequence_fields(event):
+        return {key: event[key] for key in ('group', 'seq') if key in event}
+
+    async def _send_event(self, frame_type, event, **extra):
+        """
+        Forward a channel layer event to the WebSocket.
+
+        Events carry either one `data` payload or a coalesced list of
+        `items`, which is sent as a single `<frame_type>_batch` frame.
+        Items outside the connection's topic subscriptions are dropped;
+        when none is left, only the sequence number is sent.
+        """
+        if not await self._is_new(event):
+            return
+        items = self.subscriptions.filter(
+            frame_type, event['items'] if 'items' in event else [event['data']]
+        )
+        if not items:
+            if 'seq' in event:
+                await self._queue_frame({'type': 'seq', **self._sequence_fields(event)})
+            return
+        if 'items' in event:
+            event = {**event, 'items': items}
+        extra = {**self._sequence_fields(event), **extra}
+        if 'items' in event:
+            await self._queue_frame({
+                'type': f'{frame_type}_batch',
+                'count': len(event['items']),
+                **extra,
+                'data': event['items']
+            })
+            return
+        await self._queue_frame({
+            'type': frame_type,
+            **extra,
+            'data': event['data']
+        })
+
+    async def notification_message(self, event):
+        """
+        Send notification (or a batch of notifications) to WebSocket.
+
+        `unread_delta` tells the client how much its unread counter grows:
+        admins also receive role notifications that are not theirs.
+        """
+        from .counters import counts_toward_unread
+
+        items = event['items'] if 'items' in event else [event['data']]
+        unread_delta = sum(1 for item in items if counts_toward_unread(self.user, item))
+        if 'items' in event:
+            await self._send_event(
+                'notification', event,
+                summary=f'{len(items)} nouvelles notifications',
+                counts_by_type=dict(Counter(item.get('type') for item in items)),
+                unread_delta=unread_delta
+            )
+            return
+        await self._send_event('notification', event, unread_delta=unread_delta)
+
+    async def unread_count(self, event):
+        """Send the new unread count after notifications were read."""
+        if not await self._is_new(event):
+            return
+        items = event['items'] if 'items' in event else [event['data']]
+        await self._queue_frame({
+            'type': 'unread_count',
+            **self._sequence_fields(event),
+            'count': items[-1]['count'],
+            'delta': sum(item['delta'] for item in items)
+        })
+
+    async def order_update(self, event):
+        """Send order update to WebSocket."""
+        await self._send_event('order_update', event)
+
     async def stock_alert(self, event):
         """Send stock alert to WebSocket."""
-        await self.send(text_data=json.dumps({
-            'type': 'stock_alert',
-            'data': event['data']
-        }))
+        await self._send_event('stock_alert', event)
 
     @database_sync_to_async
     def get_unread_count(self):
-        from .models import Notification
-        from django.db import models
-        return Notification.objects.filter(
-            is_read=False
-        ).filter(
-            models.Q(user=self.user) |
-            models.Q(recipient_role=self.user.role)
-        ).count()
+        from .counters import get_unread_count
+        return get_unread_count(self.user)
+
+    @database_sync_to_async
+    def get_sequences(self):
+        return replay.current_sequences([self.user_group, self.role_group])
+
+    @database_sync_to_async
+    def get_sequence(self, group):
+        return replay.current_sequence(group)
+
+    @database_sync_to_async
+    def get_events_since(self, group, seq):
+        return replay.events_since(group, seq)
+
+    @database_sync_to_async
+    def flush_metrics(self):
+        metrics.flush(self.stats)
 
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
-        from .models import Notification
-        Notification.objects.filter(id=notification_id).update(is_read=True)
+        from .services import mark_notification_read
+        mark_notification_read(self.user, notification_id)
 
     @database_sync_to_async
     def mark_all_read(self):
-        from .models import Notification
-        from django.db import models
-        Notification.objects.filter(
-            is_read=False
-        ).filter(
-            models.Q(user=self.user) |
-            models.Q(recipient_role=self.user.role)
-        ).update(is_read=True)
+        from .services import mark_all_notifications_read
+        mark_all_notifications_read(self.user)
@@ -0,0 +1,131 @@
+"""
+Unread notification counters kept in the cache.
+
+For each user the unread count is:
+
+    personal unread + (role total - role read)
+
+- `role total` is the number of notifications targeted to a role. It is
+  shared by every user of the role, so a new role notification is a
+  single cache increment whatever the number of recipients.
+- `role read` is the number of those notifications the user has read.
+- `personal unread` counts notifications targeted to the user directly.
+
+Counters are rebuilt from the database (see read_state.count_unread) on a
+cache miss, so the cache can be flushed at any time.
+"""
+
+from django.core.cache import cache
+
+from .models import Notification
+from . import read_state
+
+COUNTER_TIMEOUT = 7 * 24 * 3600
+VERSION_KEY = 'notifications:unread:version'
+
+
+def _version():
+    return cache.get(VERSION_KEY, 1)
+
+
+def _role_total_key(role, version):
+    return f'notifications:unread:v{version}:role:{role}'
+
+
+def _personal_key(user_id, version):
+    return f'notifications:unread:v{version}:user:{user_id}:personal'
+
+
+def _user_keys(user, version):
+    role_read_key = f'notifications:unread:v{version}:user:{user.id}:{user.role}:role_read'
+    return _personal_key(user.id, version), role_read_key
+
+
+def invalidate_all():
+    """Drop every counter, e.g. after notifications were purged."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def _incr(key, delta=1):
+    """Increment an existing counter; missing counters are rebuilt later."""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        return None
+
+
+def _rebuild(user, version):
+    role_total_key = _role_total_key(user.role, version)
+    personal_key, role_read_key = _user_keys(user, version)
+
+    role_total = Notification.objects.filter(
+        recipient_role=user.role, user__isnull=True
+    ).count()
+    # Keep a total already maintained by other users of the role
+    if not cache.add(role_total_key, role_total, COUNTER_TIMEOUT):
+        role_total = cache.get(role_total_key, role_total)
+
+    personal, role_unread = read_state.count_unread(user)
+    role_read = max(role_total - role_unread, 0)
+    cache.set_many({personal_key: personal, role_read_key: role_read}, COUNTER_TIMEOUT)
+    return personal, role_total, role_read
+
+
+def _load(user):
+    """Return (personal, role_total, role_read, rebuilt) for a user."""
+    version = _version()
+    role_total_key = _role_total_key(user.role, version)
+    personal_key, role_read_key = _user_keys(user, version)
+
+    values = cache.get_many([personal_key, role_read_key, role_total_key])
+    if len(values) < 3:
+        return (*_rebuild(user, version), True)
+    return values[personal_key], values[role_total_key], values[role_read_key], False
+
+
+def get_unread_count(user):
+    """Unread count for a user, without any query when the cache is warm."""
+    personal, role_total, role_read, _ = _load(user)
+    return personal + max(role_total - role_read, 0)
+
+
+def notification_created(notification):
+    """Count a new notification. Called once its transaction committed."""
+    version = _version()
+    if notification.user_id:
+        _incr(_personal_key(notification.user_id, version))
+    elif notification.recipient_role:
+        _incr(_role_total_key(notification.recipient_role, version))
+
+
+def notification_read(user, notification):
+    """Count a notification read by the user. Returns the new unread count."""
+    personal, role_total, role_read, rebuilt = _load(user)
+    if rebuilt:
+        # Rebuilt from the database, where the read is already recorded
+        return personal + max(role_total - role_read, 0)
+
+    personal_key, role_read_key = _user_keys(user, _version())
+    if notification.user_id:
+        _incr(personal_key, -1)
+    else:
+        _incr(role_read_key)
+    return get_unread_count(user)
+
+
+def all_read(user):
+    """Reset the user's counters after mark_all_read."""
+    _, role_total, _, _ = _load(user)
+    personal_key, role_read_key = _user_keys(user, _version())
+    cache.set_many({personal_key: 0, role_read_key: role_total}, COUNTER_TIMEOUT)
+    return 0
+
+
+def counts_toward_unread(user, data):
+    """Whether a pushed notification payload is unread for this user."""
+    if data.get('user_id'):
+        return data['user_id'] == user.id
+    return data.get('recipient_role') == user.role
@@ -0,0 +1,77 @@
+"""
+Transport backpressure for WebSocket writer tasks.
+
+daphne's send() never blocks: frames are written to the Twisted transport
+and pile up in its buffer when a client reads slowly (phones on a weak
+network). TransportFlow registers a streaming producer on the connection:
+Twisted pauses it when the transport's write buffer is full and resumes
+it once drained. The writer task waits for `writable` before each send,
+so pending frames stay in the bounded SendQueue, where they are coalesced
+or dropped for a resync.
+
+Servers other than daphne (tests, other ASGI servers) get no flow
+control: `writable` stays set.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _daphne_protocol(send):
+    """The daphne protocol behind an ASGI send callable, if any."""
+    if isinstance(send, functools.partial) and send.args:
+        protocol = send.args[0]
+        if hasattr(protocol, 'registerProducer'):
+            return protocol
+    return None
+
+
+class TransportFlow:
+    """Push producer pausing a writer task while the transport is full."""
+
+    def __init__(self, send, stats):
+        self.stats = stats
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.get_ident()
+        self._protocol = None
+        protocol = _daphne_protocol(send)
+        if protocol is not None:
+            try:
+                protocol.registerProducer(self, True)
+                self._protocol = protocol
+            except Exception as e:
+                logger.debug('No WebSocket flow control: %s', e)
+
+    def _call(self, function):
+        # Twisted runs on the same loop under daphne's asyncio reactor
+        if threading.get_ident() == self._thread:
+            function()
+        else:
+            self._loop.call_soon_threadsafe(function)
+
+    # IPushProducer, called by the transport
+
+    def pauseProducing(self):
+        self.stats['paused'] += 1
+        self._call(self.writable.clear)
+
+    def resumeProducing(self):
+        self._call(self.writable.set)
+
+    def stopProducing(self):
+        self._call(self.writable.set)
+
+    def close(self):
+        if self._protocol is None:
+            return
+        try:
+            self._protocol.unregisterProducer()
+        except Exception:
+            pass
+        self._protocol = None
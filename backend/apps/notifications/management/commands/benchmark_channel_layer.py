@@ -0,0 +1,103 @@
+"""
+Management command comparing group fan-out latency of channel layers.
+
+Usage:
+    python manage.py benchmark_channel_layer
+    python manage.py benchmark_channel_layer --receivers 100 --messages 500 --layers sqlite
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+GROUP = 'benchmark'
+
+
+def _build_layer(name, path):
+    if name == 'sqlite':
+        from utils.channel_layers import SQLiteChannelLayer
+        return SQLiteChannelLayer(path=path, capacity=10000)
+    if name == 'redis':
+        from channels_redis.core import RedisChannelLayer
+        return RedisChannelLayer(
+            hosts=[(settings.REDIS_HOST, settings.REDIS_PORT)], capacity=10000
+        )
+    if name == 'memory':
+        from channels.layers import InMemoryChannelLayer
+        return InMemoryChannelLayer(capacity=10000)
+    raise ValueError(name)
+
+
+async def _benchmark(layer, receivers, messages, rate):
+    """Send `messages` to a group of `receivers` channels, timing delivery."""
+    channels = [await layer.new_channel() for _ in range(receivers)]
+    for channel in channels:
+        await layer.group_add(GROUP, channel)
+
+    latencies = []
+
+    async def receive(channel):
+        for _ in range(messages):
+            message = await layer.receive(channel)
+            latencies.append(time.perf_counter() - message['sent_at'])
+
+    tasks = [asyncio.ensure_future(receive(channel)) for channel in channels]
+    started = time.perf_counter()
+    for _ in range(messages):
+        await layer.group_send(GROUP, {'type': 'benchmark', 'sent_at': time.perf_counter()})
+        if rate:
+            await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    for channel in channels:
+        await layer.group_discard(GROUP, channel)
+    return latencies, elapsed
+
+
+class Command(BaseCommand):
+    help = 'Benchmark group fan-out latency of the SQLite channel layer against Redis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receivers', type=int, default=50,
+                            help='Channels in the group')
+        parser.add_argument('--messages', type=int, default=200,
+                            help='Messages sent to the group')
+        parser.add_argument('--rate', type=float, default=50,
+                            help='Messages per second (0 = as fast as possible)')
+        parser.add_argument('--layers', default='sqlite,redis',
+                            help='Comma separated layers: sqlite, redis, memory')
+
+    def handle(self, *args, **options):
+        receivers, messages = options['receivers'], options['messages']
+        self.stdout.write(
+            f'{receivers} receivers x {messages} messages, '
+            f'{options["rate"] or "max"} msg/s\n'
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'channels.sqlite3')
+            for name in options['layers'].split(','):
+                name = name.strip()
+                try:
+                    layer = _build_layer(name, path)
+                    latencies, elapsed = asyncio.run(
+                        _benchmark(layer, receivers, messages, options['rate'])
+                    )
+                except Exception as e:
+                    self.stdout.write(self.style.WARNING(f'{name:<8} skipped: {e}'))
+                    continue
+
+                latencies.sort()
+                ms = [value * 1000 for value in latencies]
+                self.stdout.write(
+                    f'{name:<8} p50 {statistics.median(ms):7.2f} ms  '
+                    f'p95 {ms[int(len(ms) * 0.95) - 1]:7.2f} ms  '
+                    f'max {ms[-1]:7.2f} ms  '
+                    f'{len(ms) / elapsed:9.0f} deliveries/s'
+                )
@@ -0,0 +1,50 @@
+"""
+Management command to publish pending WebSocket events from the outbox.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.notifications.outbox import dispatch_all
+
+
+class Command(BaseCommand):
+    help = 'Publish pending WebSocket events from the notification outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds between polls when running continuously',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Number of messages published per batch',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = dispatch_all(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'✓ Published {count} messages'))
+            return
+
+        self.stdout.write('Dispatching outbox (Ctrl+C to stop)...')
+        try:
+            while True:
+                count = dispatch_all(options['batch_size'])
+                if count:
+                    self.stdout.write(f'Published {count} messages')
+                connections.close_all()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopped'))
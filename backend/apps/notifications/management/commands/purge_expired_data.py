@@ -0,0 +1,67 @@
+"""
+Management command to apply the data retention policies.
+
+Usage:
+    python manage.py purge_expired_data
+    python manage.py purge_expired_data --policy expired_tokens --dry-run
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.retention import get_policies, purge
+
+
+class Command(BaseCommand):
+    help = 'Delete expired notifications and tokens in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy',
+            action='append',
+            default=[],
+            help='Policy to run (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows deleted per transaction (default: RETENTION_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=None,
+            help='Seconds between batches (default: RETENTION_BATCH_PAUSE)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the rows that would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            policies = get_policies(options['policy'])
+        except KeyError as e:
+            raise CommandError(f'Unknown policy: {e.args[0]}')
+
+        total = 0
+        for policy in policies:
+            report = purge(
+                policy,
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                dry_run=options['dry_run']
+            )
+            total += report.deleted
+            if options['dry_run']:
+                self.stdout.write(f'{policy.name}: {report.deleted} rows would be deleted')
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'✓ {policy.name}: {report.deleted} rows purged '
+                        f'in {report.batches} batches ({report.seconds:.1f}s)'
+                    )
+                )
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'✓ Total: {total} rows purged'))
@@ -0,0 +1,43 @@
+"""
+WebSocket delivery metrics.
+
+Each consumer keeps its own counters (queue depth, coalesced and dropped
+frames, resyncs, pauses on a full transport) and adds them to process-wide totals in the cache when
+it disconnects or overflows, so the admin endpoint sees every daphne
+worker.
+"""
+
+from django.core.cache import cache
+
+METRICS_TIMEOUT = 7 * 24 * 3600
+METRIC_NAMES = ['connections', 'sent', 'coalesced', 'dropped', 'resyncs', 'gaps', 'paused']
+
+
+def _key(name):
+    return f'ws:metrics:{name}'
+
+
+def new_stats():
+    """Counters of one connection."""
+    return {**dict.fromkeys(METRIC_NAMES, 0), 'queue_depth': 0, 'max_queue_depth': 0}
+
+
+def flush(stats):
+    """Add a connection's counters to the totals and reset them."""
+    for name in METRIC_NAMES:
+        if not stats[name]:
+            continue
+        cache.add(_key(name), 0, METRICS_TIMEOUT)
+        cache.incr(_key(name), stats[name])
+        stats[name] = 0
+
+    key = _key('max_queue_depth')
+    if stats['max_queue_depth'] > cache.get(key, 0):
+        cache.set(key, stats['max_queue_depth'], METRICS_TIMEOUT)
+
+
+def get_totals():
+    """Totals over all connections since the counters were created."""
+    names = METRIC_NAMES + ['max_queue_depth']
+    values = cache.get_many([_key(name) for name in names])
+    return {name: values.get(_key(name), 0) for name in names}
@@ -6,21 +6,22 @@ from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
 from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth import get_user_model
 from urllib.parse import parse_qs
 
-User = get_user_model()
+from apps.users.authentication import get_cached_user
 
 
 @database_sync_to_async
 def get_user_from_token(token_string):
-    """Get user from JWT token."""
+    """Get user from JWT token (cached, so reconnect storms stay off the DB)."""
     try:
         token = AccessToken(token_string)
-        user_id = token.get('user_id')
-        return User.objects.get(id=user_id)
+        user = get_cached_user(token.get('user_id'))
     except Exception:
         return AnonymousUser()
+    if user is None or not user.is_active:
+        return AnonymousUser()
+    return user
 
 
 class JWTAuthMiddleware(BaseMiddleware):
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(max_length=150, verbose_name='Groupe')),
+                ('event_type', models.CharField(default='notification_message', max_length=50, verbose_name="Type d'événement")),
+                ('payload', models.JSONField(verbose_name='Contenu')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('failed', 'Échec')], default='pending', max_length=20, verbose_name='Statut')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Prochaine tentative')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+            ],
+            options={
+                'verbose_name': 'Message en attente',
+                'verbose_name_plural': 'Messages en attente',
+                'db_table': 'notification_outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx')],
+            },
+        ),
+    ]
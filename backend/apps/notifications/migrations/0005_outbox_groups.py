@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+def copy_group_to_groups(apps, schema_editor):
+    OutboxMessage = apps.get_model('notifications', 'OutboxMessage')
+    for message in OutboxMessage.objects.all():
+        message.groups = [message.group]
+        message.save(update_fields=['groups'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='groups',
+            field=models.JSONField(default=list, verbose_name='Groupes'),
+        ),
+        migrations.RunPython(copy_group_to_groups, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='outboxmessage',
+            name='group',
+        ),
+    ]
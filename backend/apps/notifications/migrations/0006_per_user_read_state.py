@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def convert_read_flags(apps, schema_editor):
+    """
+    Convert the shared is_read flag into per-user read state.
+
+    For each user, the watermark is moved up to the first unread visible
+    notification and read notifications above it become individual reads.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationRead = apps.get_model('notifications', 'NotificationRead')
+    NotificationReadState = apps.get_model('notifications', 'NotificationReadState')
+
+    for user in User.objects.all():
+        flags = Notification.objects.filter(
+            models.Q(user=user) | models.Q(recipient_role=user.role, user__isnull=True)
+        ).order_by('id').values_list('id', 'is_read')
+
+        watermark = 0
+        found_unread = False
+        reads = []
+        for notification_id, is_read in flags:
+            if not is_read:
+                found_unread = True
+            elif found_unread:
+                reads.append(NotificationRead(user=user, notification_id=notification_id))
+            else:
+                watermark = notification_id
+
+        if watermark:
+            NotificationReadState.objects.create(user=user, last_read_id=watermark)
+        NotificationRead.objects.bulk_create(reads)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_outbox_groups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(auto_now_add=True, verbose_name='Lu le')),
+            ],
+            options={
+                'verbose_name': 'Lecture',
+                'verbose_name_plural': 'Lectures',
+                'db_table': 'notification_reads',
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationReadState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_read_state', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+                ('last_read_id', models.BigIntegerField(default=0, verbose_name="Lu jusqu'à")),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'État de lecture',
+                'verbose_name_plural': 'États de lecture',
+                'db_table': 'notification_read_states',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'id'], name='notif_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('user__isnull', True)), fields=['recipient_role', 'id'], name='notif_role_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationread',
+            name='notification',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='notifications.notification', verbose_name='Notification'),
+        ),
+        migrations.AddField(
+            model_name='notificationread',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_reads', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationread',
+            constraint=models.UniqueConstraint(fields=('user', 'notification'), name='unique_notification_read'),
+        ),
+        migrations.RunPython(convert_read_flags, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='notification',
+            name='is_read',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_per_user_read_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='sequences',
+            field=models.JSONField(default=dict, verbose_name='Numéros de séquence'),
+        ),
+    ]
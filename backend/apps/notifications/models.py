@@ -4,6 +4,7 @@ Notification model for real-time alerts.
 
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Notification(models.Model):
@@ -13,6 +14,8 @@ class Notification(models.Model):
     Notifications can be targeted to:
     - A specific user (user field)
     - All users with a specific role (recipient_role field)
+
+    Read state is tracked per user, see NotificationReadState.
     """
 
     class NotificationType(models.TextChoices):
@@ -69,10 +72,6 @@ class Notification(models.Model):
         verbose_name='Produit lié'
     )
 
-    is_read = models.BooleanField(
-        default=False,
-        verbose_name='Lu'
-    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Créé le')
 
     class Meta:
@@ -80,6 +79,145 @@ class Notification(models.Model):
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
         ordering = ['-created_at']
+        indexes = [
+            # Unread counts are two index-only range scans above the
+            # user's read watermark: one on personal, one on role rows.
+            models.Index(fields=['user', 'id'], name='notif_user_id_idx'),
+            models.Index(
+                fields=['recipient_role', 'id'],
+                name='notif_role_id_idx',
+                condition=models.Q(user__isnull=True)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_type_display()})"
+
+
+class NotificationReadState(models.Model):
+    """
+    Per-user "read up to" watermark.
+
+    Every notification visible to the user with an id lower than or equal
+    to `last_read_id` is read. Marking everything as read is a single-row
+    update of this watermark.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_read_state',
+        verbose_name='Utilisateur'
+    )
+    last_read_id = models.BigIntegerField(
+        default=0,
+        verbose_name='Lu jusqu\'à'
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Modifié le')
+
+    class Meta:
+        db_table = 'notification_read_states'
+        verbose_name = 'État de lecture'
+        verbose_name_plural = 'États de lecture'
+
+    def __str__(self):
+        return f"{self.user} - lu jusqu'à #{self.last_read_id}"
+
+
+class NotificationRead(models.Model):
+    """
+    Notification read individually above the user's watermark.
+
+    Sparse: rows at or below the watermark are deleted when it moves.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notification_reads',
+        verbose_name='Utilisateur'
+    )
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name='reads',
+        verbose_name='Notification'
+    )
+    read_at = models.DateTimeField(auto_now_add=True, verbose_name='Lu le')
+
+    class Meta:
+        db_table = 'notification_reads'
+        verbose_name = 'Lecture'
+        verbose_name_plural = 'Lectures'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'notification'], name='unique_notification_read'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - #{self.notification_id}"
+
+
+class OutboxMessage(models.Model):
+    """
+    WebSocket event waiting to be published to the channel layer.
+
+    An event is stored once with the list of groups it goes to. Rows are
+    written in the same transaction as the data that triggered them, so
+    events for rolled back writes are never published. The outbox
+    dispatcher publishes them in batches after commit and retries failed
+    sends with a growing delay.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'En attente'
+        FAILED = 'failed', 'Échec'
+
+    groups = models.JSONField(
+        default=list,
+        verbose_name='Groupes'
+    )
+    event_type = models.CharField(
+        max_length=50,
+        default='notification_message',
+        verbose_name='Type d\'événement'
+    )
+    payload = models.JSONField(
+        verbose_name='Contenu'
+    )
+    # Sequence number given to the event in each group, reused on retry
+    sequences = models.JSONField(
+        default=dict,
+        verbose_name='Numéros de séquence'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Statut'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Tentatives'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Prochaine tentative'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Dernière erreur'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Créé le')
+
+    class Meta:
+        db_table = 'notification_outbox'
+        verbose_name = 'Message en attente'
+        verbose_name_plural = 'Messages en attente'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} -> {', '.join(self.groups)} ({self.get_status_display()})"
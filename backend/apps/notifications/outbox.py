@@ -0,0 +1,297 @@
+"""
+Transactional outbox for WebSocket events.
+
+Services never talk to the channel layer directly: they call `enqueue()`
+(or `enqueue_many()`),
+which stores the event in the current transaction. Once the transaction
+commits, the dispatcher thread is woken up and publishes pending events
+in batches, so request latency does not depend on Redis and clients are
+never told about rows that were rolled back.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxMessage
+from . import replay
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, f'NOTIFICATION_OUTBOX_{name}', default)
+
+
+def enqueue(groups, data, event_type='notification_message'):
+    """
+    Store an event for one or several groups in the outbox.
+
+    The event is published after the surrounding transaction commits
+    (immediately when called outside of a transaction).
+    """
+    if isinstance(groups, str):
+        groups = [groups]
+    message = OutboxMessage.objects.create(
+        groups=list(groups),
+        event_type=event_type,
+        payload=data
+    )
+    if _setting('AUTOSTART', True):
+        transaction.on_commit(dispatcher.wake)
+    return message
+
+
+def enqueue_many(groups, items, event_type='notification_message'):
+    """Store several events for the same groups with one insert."""
+    if isinstance(groups, str):
+        groups = [groups]
+    messages = OutboxMessage.objects.bulk_create([
+        OutboxMessage(groups=list(groups), event_type=event_type, payload=data)
+        for data in items
+    ])
+    if messages and _setting('AUTOSTART', True):
+        transaction.on_commit(dispatcher.wake)
+    return messages
+
+
+def build_frames(messages):
+    """
+    Coalesce messages into one channel layer event per group and type.
+
+    A single message gives the usual `{'type', 'data'}` event; several
+    messages for the same group give one `{'type', 'items'}` batch event,
+    so a burst of 100 orders reaches each manager as a single frame.
+    Messages that already got a sequence number in a group (retries) are
+    only grouped with the messages of that same frame.
+
+    Returns:
+        List of (group, event, messages) tuples
+    """
+    buckets = {}
+    for message in messages:
+        for group in message.groups:
+            key = (group, message.event_type, message.sequences.get(group))
+            buckets.setdefault(key, []).append(message)
+
+    frames = []
+    for (group, event_type, _), bucket in buckets.items():
+        if len(bucket) == 1:
+            event = {'type': event_type, 'data': bucket[0].payload}
+        else:
+            event = {'type': event_type, 'items': [message.payload for message in bucket]}
+        frames.append((group, event, bucket))
+    return frames
+
+
+async def _publish(channel_layer, frames):
+    """
+    Send the frames, returning one result per frame (None or the error).
+
+    Groups are published concurrently, but the frames of one group are
+    sent one after the other in sequence order: a client receiving seq
+    n + 1 before n would take it for a gap and replay.
+    """
+    results = [None] * len(frames)
+    by_group = {}
+    for index, (group, _, _) in enumerate(frames):
+        by_group.setdefault(group, []).append(index)
+
+    async def publish_group(indexes):
+        for index in indexes:
+            group, event, _ = frames[index]
+            try:
+                await channel_layer.group_send(group, event)
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*[publish_group(indexes) for indexes in by_group.values()])
+    return results
+
+
+def _number_frames(frames):
+    """
+    Stamp each frame with its group and sequence number.
+
+    New frames are recorded in the replay buffer and their sequence
+    number is kept on their messages; retried frames are sent again
+    under the number they were first given, so clients never see the
+    same event twice. A frame whose recording failed (cache down) gets
+    the error instead of an event and is retried like a failed send.
+
+    Returns:
+        List of (group, event or error, messages) tuples
+    """
+    numbered = []
+    for group, event, bucket in frames:
+        seq = bucket[0].sequences.get(group)
+        if seq is not None:
+            numbered.append((group, {**event, 'group': group, 'seq': seq}, bucket))
+            continue
+        try:
+            event = replay.record(group, event)
+        except Exception as e:
+            numbered.append((group, e, bucket))
+            continue
+        for message in bucket:
+            message.sequences[group] = event['seq']
+        numbered.append((group, event, bucket))
+    return numbered
+
+
+def dispatch_pending(batch_size=None):
+    """
+    Publish one batch of due outbox messages.
+
+    Due rows are claimed in a short transaction (locked with SKIP LOCKED
+    on databases supporting it, then hidden from other dispatchers for
+    NOTIFICATION_OUTBOX_CLAIM_TIMEOUT seconds) and published after it
+    commits, so no lock or transaction is held during network I/O. Rows
+    claimed by a dispatcher that died are picked up again once the claim
+    expires, with the same sequence numbers.
+
+    Published rows are deleted; rows with failed groups keep only those
+    groups (and their sequence numbers) and are rescheduled with
+    exponential backoff, then marked as failed once the maximum number of
+    attempts is reached.
+
+    Returns:
+        Number of messages processed in this batch
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return 0
+
+    batch_size = batch_size or _setting('BATCH_SIZE', 100)
+    max_attempts = _setting('MAX_ATTEMPTS', 5)
+    retry_delay = _setting('RETRY_DELAY', 2)
+    claim_timeout = _setting('CLAIM_TIMEOUT', 60)
+    now = timezone.now()
+
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                status=OutboxMessage.Status.PENDING,
+                next_attempt_at__lte=now
+            ).order_by('id')[:batch_size]
+        )
+        if not messages:
+            return 0
+        OutboxMessage.objects.filter(id__in=[message.id for message in messages]).update(
+            next_attempt_at=now + timedelta(seconds=claim_timeout)
+        )
+
+    # Number each frame so reconnecting clients can replay what they
+    # missed, and keep the numbers before sending in case we die midway
+    frames = _number_frames(build_frames(messages))
+    OutboxMessage.objects.bulk_update(messages, ['sequences'])
+    results = iter(async_to_sync(_publish)(channel_layer, [
+        frame for frame in frames if not isinstance(frame[1], Exception)
+    ]))
+
+    failed_groups = {}
+    errors = {}
+    for group, event, bucket in frames:
+        result = event if isinstance(event, Exception) else next(results)
+        if not isinstance(result, Exception):
+            continue
+        for message in bucket:
+            failed_groups.setdefault(message.id, []).append(group)
+            errors[message.id] = result
+
+    with transaction.atomic():
+        sent_ids = [message.id for message in messages if message.id not in failed_groups]
+        if sent_ids:
+            OutboxMessage.objects.filter(id__in=sent_ids).delete()
+
+        for message in messages:
+            if message.id not in failed_groups:
+                continue
+            attempts = message.attempts + 1
+            OutboxMessage.objects.filter(id=message.id).update(
+                groups=failed_groups[message.id],
+                attempts=F('attempts') + 1,
+                last_error=str(errors[message.id])[:1000],
+                next_attempt_at=now + timedelta(seconds=retry_delay * 2 ** attempts),
+                status=(
+                    OutboxMessage.Status.FAILED if attempts >= max_attempts
+                    else OutboxMessage.Status.PENDING
+                )
+            )
+            logger.warning(
+                'Outbox message %s to %s failed (attempt %s): %s',
+                message.id, ', '.join(failed_groups[message.id]), attempts, errors[message.id]
+            )
+
+    return len(messages)
+
+
+def dispatch_all(batch_size=None):
+    """Publish due outbox messages until none are left."""
+    batch_size = batch_size or _setting('BATCH_SIZE', 100)
+    total = 0
+    while True:
+        processed = dispatch_pending(batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+class OutboxDispatcher:
+    """
+    Background thread publishing the outbox.
+
+    The thread is started lazily by the first `wake()` call. When woken up
+    after a commit it waits NOTIFICATION_OUTBOX_COALESCE_WINDOW seconds so
+    that bursts are published as batched frames, then drains the outbox.
+    It also polls every NOTIFICATION_OUTBOX_POLL_INTERVAL seconds to pick
+    up retries.
+    """
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        self._ensure_started()
+        self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name='notification-outbox',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        poll_interval = _setting('POLL_INTERVAL', 5)
+        coalesce_window = _setting('COALESCE_WINDOW', 0.25)
+        while True:
+            if self._wakeup.wait(timeout=poll_interval) and coalesce_window:
+                time.sleep(coalesce_window)
+            self._wakeup.clear()
+            try:
+                dispatch_all()
+            except Exception:
+                logger.exception('Outbox dispatch failed')
+            finally:
+                connections.close_all()
+
+
+dispatcher = OutboxDispatcher()
@@ -0,0 +1,123 @@
+"""
+Per-user read tracking for notifications.
+
+A notification targeted to a role is shared by every user of that role,
+so "read" cannot be a flag on the notification itself. Each user has a
+watermark (NotificationReadState.last_read_id): everything visible at or
+below it is read. Notifications read one by one above the watermark are
+recorded in the sparse NotificationRead table.
+"""
+
+from django.db.models import Max, Q
+
+from .models import Notification, NotificationRead, NotificationReadState
+
+
+def visible_notifications(user):
+    """Notifications targeted to the user or to the user's role."""
+    return Notification.objects.filter(
+        Q(user=user) | Q(recipient_role=user.role, user__isnull=True)
+    )
+
+
+def get_watermark(user):
+    """Return the id up to which the user has read everything."""
+    last_read_id = NotificationReadState.objects.filter(
+        user=user
+    ).values_list('last_read_id', flat=True).first()
+    return last_read_id or 0
+
+
+def count_unread(user, watermark=None):
+    """
+    Count unread notifications for a user, split by target.
+
+    Each count is an index-only range scan above the watermark, instead of
+    an OR query over the whole notifications table.
+
+    Returns:
+        Tuple (personal_unread, role_unread)
+    """
+    if watermark is None:
+        watermark = get_watermark(user)
+
+    personal = Notification.objects.filter(user=user, id__gt=watermark).count()
+    role = Notification.objects.filter(
+        recipient_role=user.role, user__isnull=True, id__gt=watermark
+    ).count()
+    reads = dict.fromkeys(['personal', 'role'], 0)
+    for user_id in NotificationRead.objects.filter(
+        user=user, notification_id__gt=watermark
+    ).values_list('notification__user', flat=True):
+        reads['personal' if user_id else 'role'] += 1
+
+    return max(personal - reads['personal'], 0), max(role - reads['role'], 0)
+
+
+def get_unread_count(user):
+    """Total number of unread notifications for a user."""
+    return sum(count_unread(user))
+
+
+def mark_read(user, notification_id):
+    """
+    Mark one notification as read for a user.
+
+    Returns:
+        The notification if it was unread and is now read, else None
+    """
+    notification = visible_notifications(user).filter(
+        id=notification_id
+    ).only('id', 'user_id').first()
+    if notification is None or notification.id <= get_watermark(user):
+        return None
+
+    _, created = NotificationRead.objects.get_or_create(
+        user=user,
+        notification=notification
+    )
+    return notification if created else None
+
+
+def mark_all_read(user):
+    """
+    Mark every notification visible to the user as read.
+
+    Moves the user's watermark to the latest notification the user can
+    see (one row) and drops the individual reads it now covers.
+
+    Ids are handed out before commit: a notification with a lower id
+    that commits after this query is covered by the watermark without
+    having been shown. The window is the length of a notification
+    insert and the loss is one unread badge, so the race is accepted
+    rather than ordering reads on commit.
+
+    Returns:
+        The new watermark
+    """
+    last_id = visible_notifications(user).aggregate(last_id=Max('id'))['last_id'] or 0
+    NotificationReadState.objects.update_or_create(
+        user=user,
+        defaults={'last_read_id': last_id}
+    )
+    NotificationRead.objects.filter(user=user, notification_id__lte=last_id).delete()
+    return last_id
+
+
+class ReadState:
+    """
+    Read state of one user, loaded once and queried per notification.
+
+    Used by serializers to expose `is_read` without a query per row.
+    """
+
+    def __init__(self, user):
+        self.watermark = get_watermark(user)
+        self.read_ids = set(
+            NotificationRead.objects.filter(
+                user=user, notification_id__gt=self.watermark
+            ).values_list('notification_id', flat=True)
+        )
+
+    def is_read(self, notification):
+        return notification.id <= self.watermark or notification.id in self.read_ids
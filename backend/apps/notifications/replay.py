@@ -0,0 +1,75 @@
+"""
+Sequence numbers and replay buffer for WebSocket events.
+
+Every event published to a group gets the next sequence number of that
+group and is kept in a bounded ring buffer in the cache: slot
+`seq % NOTIFICATION_REPLAY_BUFFER_SIZE`. A client reconnecting with the
+last sequence it has seen is replayed what it missed; when the gap is
+larger than the buffer (or the cache was flushed) the client is told to
+do a full refresh instead.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+BUFFER_SIZE = getattr(settings, 'NOTIFICATION_REPLAY_BUFFER_SIZE', 200)
+EVENT_TIMEOUT = getattr(settings, 'NOTIFICATION_REPLAY_TIMEOUT', 24 * 3600)
+
+
+def _sequence_key(group):
+    return f'ws:seq:{group}'
+
+
+def _slot_key(group, seq):
+    return f'ws:events:{group}:{seq % BUFFER_SIZE}'
+
+
+def current_sequence(group):
+    """Last sequence number published to a group (0 if none)."""
+    return cache.get(_sequence_key(group), 0)
+
+
+def current_sequences(groups):
+    """Last sequence numbers of several groups, in one cache round trip."""
+    values = cache.get_many([_sequence_key(group) for group in groups])
+    return {group: values.get(_sequence_key(group), 0) for group in groups}
+
+
+def record(group, event):
+    """
+    Assign the next sequence number of `group` to an event and store it.
+
+    Returns:
+        The event stamped with `group` and `seq`
+    """
+    key = _sequence_key(group)
+    cache.add(key, 0, None)
+    seq = cache.incr(key)
+    event = {**event, 'group': group, 'seq': seq}
+    cache.set(_slot_key(group, seq), event, EVENT_TIMEOUT)
+    return event
+
+
+def events_since(group, last_seq):
+    """
+    Events published to `group` after `last_seq`, oldest first.
+
+    Returns:
+        List of events, or None when they are no longer all in the buffer
+        and the client must do a full refresh
+    """
+    current = current_sequence(group)
+    if last_seq == current:
+        return []
+    if last_seq > current or current - last_seq > BUFFER_SIZE:
+        return None
+
+    sequences = range(last_seq + 1, current + 1)
+    stored = cache.get_many([_slot_key(group, seq) for seq in sequences])
+    events = []
+    for seq in sequences:
+        event = stored.get(_slot_key(group, seq))
+        if event is None or event.get('seq') != seq:
+            return None
+        events.append(event)
+    return events
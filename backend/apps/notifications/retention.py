@@ -0,0 +1,54 @@
+"""
+Retention policies for notifications (see utils/retention.py).
+
+Read notifications go first: personal ones read by their user, role
+ones read by every active user of the role (watermark or individual
+read). Every notification goes once it is older than the global limit,
+read or not.
+"""
+
+from django.db.models import Exists, F, OuterRef, Q
+
+from apps.users.models import User
+from utils.retention import RetentionPolicy, register
+
+# Active users of the notification's role who have not read it
+_role_unread_by = User.objects.filter(
+    role=OuterRef('recipient_role'),
+    is_active=True
+).exclude(
+    notification_read_state__last_read_id__gte=OuterRef('id')
+).exclude(
+    notification_reads__notification=OuterRef('id')
+)
+
+
+def _invalidate_counters(report):
+    # Role totals and per-user counts include the purged rows
+    from .counters import invalidate_all
+    invalidate_all()
+
+
+register(RetentionPolicy(
+    'notifications_read',
+    'notifications.Notification',
+    'created_at',
+    days=30,
+    filter=(
+        Q(user__isnull=False) & (
+            Q(id__lte=F('user__notification_read_state__last_read_id'))
+            | Q(reads__user=F('user'))
+        )
+    ) | (
+        Q(user__isnull=True) & ~Exists(_role_unread_by)
+    ),
+    after_purge=_invalidate_counters
+))
+
+register(RetentionPolicy(
+    'notifications',
+    'notifications.Notification',
+    'created_at',
+    days=90,
+    after_purge=_invalidate_counters
+))
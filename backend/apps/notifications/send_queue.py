@@ -0,0 +1,115 @@
+"""
+Bounded outbound queue of one WebSocket connection.
+
+Frames wait here until the connection's writer task sends them. The
+queue never grows past NOTIFICATION_WS_QUEUE_SIZE frames:
+
+- State-like frames (unread count, a product's stock level, an order
+  delta) are coalesced with the pending frame for the same object, so a
+  burst of updates costs one frame per object. The merged frame moves to
+  the end of the queue and covers the sequence numbers `first_seq` to
+  `seq`: frames are still sent in sequence order, so a client never
+  holds a sequence number whose earlier events are still queued.
+- When the queue is still full, everything pending is dropped: the
+  client is told to resync and refetches its data instead.
+"""
+
+from collections import deque
+
+
+def coalesce_key(frame):
+    """Key of the object a frame describes, or None if it cannot be merged."""
+    frame_type = frame.get('type')
+    group = frame.get('group')
+    if frame_type == 'unread_count':
+        return frame_type, group
+    data = frame.get('data')
+    if not isinstance(data, dict):
+        return None
+    if frame_type == 'stock_alert':
+        return frame_type, group, data.get('product_id')
+    if frame_type == 'order_update':
+        return frame_type, group, data.get('id')
+    return None
+
+
+def merge(pending, frame):
+    """Fold a newer frame into the pending frame for the same object."""
+    if frame['type'] == 'unread_count':
+        pending['count'] = frame['count']
+        pending['delta'] = pending.get('delta', 0) + frame.get('delta', 0)
+    elif frame['type'] == 'order_update':
+        old, new = pending['data'], frame['data']
+        pending['data'] = {
+            **new,
+            'action': old.get('action') if old.get('action') == 'created' else new.get('action'),
+            'changes': {**(old.get('changes') or {}), **(new.get('changes') or {})},
+        }
+    else:
+        pending['data'] = frame['data']
+    if 'seq' in frame:
+        pending.setdefault('first_seq', pending.get('seq', frame['seq']))
+        pending['seq'] = frame['seq']
+
+
+class SendQueue:
+    """FIFO of frames (dicts) with coalescing and a hard size limit."""
+
+    def __init__(self, max_size, stats):
+        self.max_size = max_size
+        self.stats = stats
+        self.frames = deque()
+        self.pending = {}
+
+    def __len__(self):
+        return len(self.frames)
+
+    def push(self, frame):
+        """
+        Queue a frame.
+
+        Returns:
+            False if the queue overflowed and was cleared, else True
+        """
+        key = coalesce_key(frame)
+        if key is not None and key in self.pending:
+            pending = self.pending[key]
+            merge(pending, frame)
+            self._move_to_end(pending)
+            self.stats['coalesced'] += 1
+            return True
+
+        if len(self.frames) >= self.max_size:
+            self.stats['dropped'] += len(self.frames) + 1
+            self.clear()
+            return False
+
+        self.frames.append(frame)
+        if key is not None:
+            self.pending[key] = frame
+        self._update_depth()
+        return True
+
+    def pop(self):
+        frame = self.frames.popleft()
+        key = coalesce_key(frame)
+        if key is not None and self.pending.get(key) is frame:
+            del self.pending[key]
+        self._update_depth()
+        return frame
+
+    def _move_to_end(self, frame):
+        for index, queued in enumerate(self.frames):
+            if queued is frame:
+                del self.frames[index]
+                break
+        self.frames.append(frame)
+
+    def clear(self):
+        self.frames.clear()
+        self.pending.clear()
+        self._update_depth()
+
+    def _update_depth(self):
+        self.stats['queue_depth'] = len(self.frames)
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], len(self.frames))
@@ -4,6 +4,7 @@ Serializers for Notification model.
 
 from rest_framework import serializers
 from .models import Notification
+from .read_state import ReadState
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -11,6 +12,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     order_number = serializers.CharField(source='related_order.order_number', read_only=True)
     product_name = serializers.CharField(source='related_product.name', read_only=True)
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
@@ -21,3 +23,13 @@ class NotificationSerializer(serializers.ModelSerializer):
             'is_read', 'created_at'
         ]
         read_only_fields = ['id', 'type', 'title', 'message', 'created_at']
+
+    def get_is_read(self, obj):
+        """Per-user read flag, from the ReadState passed in context."""
+        read_state = self.context.get('read_state')
+        if read_state is None:
+            request = self.context.get('request')
+            if request is None:
+                return False
+            read_state = self.context['read_state'] = ReadState(request.user)
+        return read_state.is_read(obj)
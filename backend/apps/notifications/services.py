@@ -2,41 +2,68 @@
 Notification services for creating and sending notifications.
 """
 
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
 from .models import Notification
+from .outbox import enqueue, enqueue_many
+from . import counters, read_state
 from apps.users.models import User
 
+# Read state is per user, so a low stock alert is repeated at most once
+# per cooldown instead of "while unread".
+LOW_STOCK_NOTIFICATION_COOLDOWN = timedelta(hours=12)
+
+# Order numbers listed in a grouped delivery notification
+DELIVERED_ORDERS_SHOWN = 5
+
+# Roles following the order board and stock levels live
+ORDER_UPDATE_ROLES = [User.Role.GESTIONNAIRE_COMMANDES, User.Role.ADMIN, User.Role.VENDEUR]
+STOCK_UPDATE_ROLES = [User.Role.GESTIONNAIRE_STOCKS, User.Role.ADMIN, User.Role.VENDEUR]
 
-def send_websocket_notification(notification_data, target_role=None, target_user=None):
+
+def send_websocket_notification(notification_data, target_role=None, target_user=None,
+                                target_roles=None):
     """
-    Send notification via WebSocket.
+    Queue a notification for WebSocket delivery.
+
+    The event is stored once in the outbox, whatever the number of target
+    groups, and published once the current transaction commits, so callers
+    never wait on the channel layer.
 
     Args:
         notification_data: Dict with notification info
         target_role: Role to send to (e.g., 'gestionnaire_commandes')
         target_user: Specific user to send to
+        target_roles: Several roles to send the same payload to
     """
-    channel_layer = get_channel_layer()
-
     if target_user:
         # Send to specific user
-        async_to_sync(channel_layer.group_send)(
-            f"user_{target_user.id}",
-            {
-                'type': 'notification_message',
-                'data': notification_data
-            }
-        )
-    elif target_role:
-        # Send to role group
-        async_to_sync(channel_layer.group_send)(
-            f"role_{target_role}",
-            {
-                'type': 'notification_message',
-                'data': notification_data
-            }
-        )
+        enqueue([f"user_{target_user.id}"], notification_data)
+        return
+
+    roles = list(target_roles or [])
+    if target_role:
+        roles.insert(0, target_role)
+    if roles:
+        # Send to role groups
+        enqueue([f"role_{role}" for role in dict.fromkeys(roles)], notification_data)
+
+
+def _notification_payload(notification, **extra):
+    """Build the WebSocket payload of a notification."""
+    return {
+        'id': notification.id,
+        'type': notification.type,
+        'title': notification.title,
+        'message': notification.message,
+        'recipient_role': notification.recipient_role,
+        'user_id': notification.user_id,
+        **extra,
+        'created_at': notification.created_at.isoformat()
+    }
 
 
 def create_new_order_notification(order):
@@ -50,34 +77,15 @@ def create_new_order_notification(order):
         related_order=order
     )
 
-    # Send WebSocket notification
-    send_websocket_notification(
-        {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'message': notification.message,
-            'order_id': order.id,
-            'order_number': order.order_number,
-            'priority': order.priority,
-            'created_at': notification.created_at.isoformat()
-        },
-        target_role=User.Role.GESTIONNAIRE_COMMANDES
-    )
-
-    # Also notify admins
+    # Send WebSocket notification to order managers and admins
     send_websocket_notification(
-        {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'message': notification.message,
-            'order_id': order.id,
-            'order_number': order.order_number,
-            'priority': order.priority,
-            'created_at': notification.created_at.isoformat()
-        },
-        target_role=User.Role.ADMIN
+        _notification_payload(
+            notification,
+            order_id=order.id,
+            order_number=order.order_number,
+            priority=order.priority
+        ),
+        target_roles=[User.Role.GESTIONNAIRE_COMMANDES, User.Role.ADMIN]
     )
 
     return notification
@@ -94,15 +102,42 @@ def create_order_delivered_notification(order):
     )
 
     send_websocket_notification(
-        {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'message': notification.message,
-            'order_id': order.id,
-            'order_number': order.order_number,
-            'created_at': notification.created_at.isoformat()
-        },
+        _notification_payload(
+            notification,
+            order_id=order.id,
+            order_number=order.order_number
+        ),
+        target_role=User.Role.GESTIONNAIRE_COMMANDES
+    )
+
+    return notification
+
+
+def create_orders_delivered_notification(orders):
+    """
+    Create one notification for several orders delivered together
+    (bulk status updates).
+    """
+    if len(orders) == 1:
+        return create_order_delivered_notification(orders[0])
+
+    numbers = [order.order_number for order in orders]
+    shown = ', '.join(numbers[:DELIVERED_ORDERS_SHOWN])
+    if len(numbers) > DELIVERED_ORDERS_SHOWN:
+        shown += f' et {len(numbers) - DELIVERED_ORDERS_SHOWN} autres'
+    notification = Notification.objects.create(
+        type=Notification.NotificationType.ORDER_DELIVERED,
+        title='Commandes livrées',
+        message=f'{len(numbers)} commandes ont été livrées : {shown}',
+        recipient_role=User.Role.GESTIONNAIRE_COMMANDES
+    )
+
+    send_websocket_notification(
+        _notification_payload(
+            notification,
+            order_ids=[order.id for order in orders],
+            order_numbers=numbers
+        ),
         target_role=User.Role.GESTIONNAIRE_COMMANDES
     )
 
@@ -115,7 +150,7 @@ def create_low_stock_notification(product):
     recent = Notification.objects.filter(
         type=Notification.NotificationType.LOW_STOCK,
         related_product=product,
-        is_read=False
+        created_at__gte=timezone.now() - LOW_STOCK_NOTIFICATION_COOLDOWN
     ).exists()
 
     if recent:
@@ -129,33 +164,15 @@ def create_low_stock_notification(product):
         related_product=product
     )
 
+    # Send WebSocket notification to stock managers and admins
     send_websocket_notification(
-        {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'message': notification.message,
-            'product_id': product.id,
-            'product_name': product.name,
-            'stock_quantity': product.stock_quantity,
-            'created_at': notification.created_at.isoformat()
-        },
-        target_role=User.Role.GESTIONNAIRE_STOCKS
-    )
-
-    # Also notify admins
-    send_websocket_notification(
-        {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'message': notification.message,
-            'product_id': product.id,
-            'product_name': product.name,
-            'stock_quantity': product.stock_quantity,
-            'created_at': notification.created_at.isoformat()
-        },
-        target_role=User.Role.ADMIN
+        _notification_payload(
+            notification,
+            product_id=product.id,
+            product_name=product.name,
+            stock_quantity=product.stock_quantity
+        ),
+        target_roles=[User.Role.GESTIONNAIRE_STOCKS, User.Role.ADMIN]
     )
 
     return notification
@@ -172,17 +189,120 @@ def create_expiration_notification(product):
     )
 
     send_websocket_notification(
-        {
-            'id': notification.id,
-            'type': notification.type,
-            'title': notification.title,
-            'message': notification.message,
-            'product_id': product.id,
-            'product_name': product.name,
-            'expiration_date': product.expiration_date.isoformat(),
-            'created_at': notification.created_at.isoformat()
-        },
+        _notification_payload(
+            notification,
+            product_id=product.id,
+            product_name=product.name,
+            expiration_date=product.expiration_date.isoformat()
+        ),
         target_role=User.Role.GESTIONNAIRE_STOCKS
     )
 
     return notification
+
+
+def push_unread_count(user, count, delta):
+    """Push a user's new unread count to all of the user's sockets."""
+    enqueue([f"user_{user.id}"], {'count': count, 'delta': delta}, event_type='unread_count')
+
+
+def mark_notification_read(user, notification_id):
+    """Mark one notification as read for a user and push the new count."""
+    notification = read_state.mark_read(user, notification_id)
+    if notification is None:
+        return None
+    count = counters.notification_read(user, notification)
+    push_unread_count(user, count, -1)
+    return notification
+
+
+def mark_all_notifications_read(user):
+    """Mark all notifications as read for a user and push the new count."""
+    previous = counters.get_unread_count(user)
+    read_state.mark_all_read(user)
+    counters.all_read(user)
+    if previous:
+        push_unread_count(user, 0, -previous)
+
+
+def _json_value(value):
+    """Make a model field value JSON friendly."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def send_order_update(order, changes, created=False):
+    """
+    Publish an order delta on the `order_update` channel.
+
+    Only the changed fields are sent, with the order's new sort key, so
+    clients patch their lists in place instead of re-fetching them. The
+    fields clients can subscribe to (see topics.py) are always included.
+
+    Args:
+        order: Order instance, after save
+        changes: Dict of changed field names to their new values
+        created: Whether the order was just created
+    """
+    enqueue(
+        [f"role_{role}" for role in ORDER_UPDATE_ROLES],
+        _order_update_payload(order, changes, created),
+        event_type='order_update'
+    )
+
+
+def send_order_updates(orders, changes):
+    """Publish the same changes for several orders (bulk updates)."""
+    enqueue_many(
+        [f"role_{role}" for role in ORDER_UPDATE_ROLES],
+        [_order_update_payload(order, changes) for order in orders],
+        event_type='order_update'
+    )
+
+
+def _order_update_payload(order, changes, created=False):
+    return {
+        'id': order.id,
+        'order_number': order.order_number,
+        'action': 'created' if created else 'updated',
+        'delivery_status': order.delivery_status,
+        'priority': order.priority,
+        'delivery_date': _json_value(order.delivery_date),
+        'changes': {field: _json_value(value) for field, value in changes.items()},
+        'sort_key': order.sort_key,
+        'updated_at': _json_value(order.updated_at)
+    }
+
+
+def send_stock_update(movement):
+    """Publish a product's new stock level on the `stock_alert` channel."""
+    enqueue(
+        [f"role_{role}" for role in STOCK_UPDATE_ROLES],
+        _stock_update_payload(movement),
+        event_type='stock_alert'
+    )
+
+
+def send_stock_updates(movements):
+    """Publish the stock levels left by several movements (bulk inserts)."""
+    enqueue_many(
+        [f"role_{role}" for role in STOCK_UPDATE_ROLES],
+        [_stock_update_payload(movement) for movement in movements],
+        event_type='stock_alert'
+    )
+
+
+def _stock_update_payload(movement):
+    product = movement.product
+    return {
+        'product_id': product.id,
+        'movement_id': movement.id,
+        'movement_type': movement.movement_type,
+        'quantity': movement.quantity,
+        'stock_quantity': movement.new_quantity,
+        'is_low_stock': movement.new_quantity <= product.min_stock_level,
+        'is_out_of_stock': movement.new_quantity <= 0
+    }
@@ -0,0 +1,18 @@
+"""
+Signals for Notification model.
+Keeps the cached unread counters in sync with new notifications.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    """Increment unread counters once the notification is committed."""
+    if created:
+        from .counters import notification_created
+        transaction.on_commit(lambda: notification_created(instance))
@@ -0,0 +1,100 @@
+"""
+Topic subscriptions for WebSocket clients.
+
+A topic narrows one event channel to the items matching a field value:
+
+    orders                          every order update (default)
+    orders.priority:haute           high priority orders only
+    orders.delivery_date:2025-01-31 orders delivered on a given date
+    orders.delivery_status:en_cours orders in a given status
+    stock.product:12                stock changes of product 12
+    stock.low:true                  products at or below their minimum
+
+A channel without subscriptions receives everything, so clients that
+never subscribe keep the previous behaviour. Once a client subscribes to
+topics of a channel, it receives the items matching any of them.
+"""
+
+# Event type published by the outbox -> channel name used in topics
+EVENT_CHANNELS = {
+    'order_update': 'orders',
+    'stock_alert': 'stock',
+}
+
+# Filterable fields per channel -> function extracting the value of an item
+TOPIC_FIELDS = {
+    'orders': {
+        'priority': lambda item: item.get('priority'),
+        'delivery_date': lambda item: item.get('delivery_date'),
+        'delivery_status': lambda item: item.get('delivery_status'),
+    },
+    'stock': {
+        'product': lambda item: str(item.get('product_id')),
+        'low': lambda item: 'true' if item.get('is_low_stock') else 'false',
+    },
+}
+
+
+def parse_topic(topic):
+    """
+    Parse `channel[.field:value]` into (channel, field, value).
+
+    Raises:
+        ValueError: If the channel or field is unknown
+    """
+    channel, _, condition = str(topic).partition('.')
+    if channel not in TOPIC_FIELDS:
+        raise ValueError(topic)
+    if not condition:
+        return channel, None, None
+
+    field, _, value = condition.partition(':')
+    if field not in TOPIC_FIELDS[channel] or not value:
+        raise ValueError(topic)
+    return channel, field, value
+
+
+def format_topic(channel, field, value):
+    return channel if field is None else f'{channel}.{field}:{value}'
+
+
+def _matches(item, channel, field, value):
+    if field is None:
+        return True
+    if TOPIC_FIELDS[channel][field](item) == value:
+        return True
+    # Updates of a filtered field are always sent, so that clients can
+    # drop the items leaving their view
+    return item.get('action') == 'updated' and field in (item.get('changes') or {})
+
+
+class Subscriptions:
+    """Topics one connection is subscribed to."""
+
+    def __init__(self):
+        self.topics = set()
+
+    def subscribe(self, topics):
+        # Parse everything first: an invalid topic changes nothing
+        self.topics.update([parse_topic(topic) for topic in topics])
+
+    def unsubscribe(self, topics=None):
+        """Drop the given topics, or all of them."""
+        if topics is None:
+            self.topics.clear()
+            return
+        self.topics.difference_update([parse_topic(topic) for topic in topics])
+
+    def as_list(self):
+        return sorted(format_topic(*topic) for topic in self.topics)
+
+    def filter(self, event_type, items):
+        """Items of an event that this connection should receive."""
+        channel = EVENT_CHANNELS.get(event_type)
+        topics = [topic for topic in self.topics if topic[0] == channel]
+        if not topics:
+            return items
+        return [
+            item for item in items
+            if any(_matches(item, *topic) for topic in topics)
+        ]
@@ -6,9 +6,12 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
 
-from .models import Notification
+from apps.users.permissions import IsAdmin
+from . import metrics
+from .counters import get_unread_count
+from .read_state import ReadState, visible_notifications
+from .services import mark_notification_read, mark_all_notifications_read
 from .serializers import NotificationSerializer
 
 
@@ -19,27 +22,35 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         """Get notifications for current user (by user or role)."""
-        user = self.request.user
-        return Notification.objects.filter(
-            Q(user=user) | Q(recipient_role=user.role)
+        return visible_notifications(self.request.user).select_related(
+            'related_order', 'related_product'
         ).order_by('-created_at')
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['read_state'] = ReadState(self.request.user)
+        return context
+
     @action(detail=False, methods=['get'])
     def unread(self, request):
         """Get unread notification count."""
-        count = self.get_queryset().filter(is_read=False).count()
+        count = get_unread_count(request.user)
         return Response({'unread_count': count})
 
     @action(detail=True, methods=['post'])
     def read(self, request, pk=None):
         """Mark notification as read."""
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        mark_notification_read(request.user, notification.id)
         return Response({'detail': 'Notification marquée comme lue.'})
 
     @action(detail=False, methods=['post'])
     def read_all(self, request):
         """Mark all notifications as read."""
-        self.get_queryset().filter(is_read=False).update(is_read=True)
+        mark_all_notifications_read(request.user)
         return Response({'detail': 'Toutes les notifications marquées comme lues.'})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdmin])
+    def ws_metrics(self, request):
+        """WebSocket delivery totals (queue depth, coalesced/dropped frames)."""
+        return Response(metrics.get_totals())
@@ -31,7 +31,10 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.WARNING('Starting data reset...'))
 
-        with transaction.atomic():
+        from apps.audit.tracking import suspended
+
+        # Audit logs are wiped below: do not record every deleted row
+        with transaction.atomic(), suspended():
             # Import models
             from apps.orders.models import Order, OrderItem
             from apps.products.models import Product, Category
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:33
+
+from django.db import migrations, models
+
+from utils.search import normalize_phone, normalize_text, postgres_search_indexes
+
+
+def fill_client_keys(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    rows = list(Order.objects.only('client_name', 'client_phone'))
+    for row in rows:
+        row.client_search_name = normalize_text(row.client_name)
+        row.client_phone_key = normalize_phone(row.client_phone)
+    Order.objects.bulk_update(rows, ['client_search_name', 'client_phone_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_alter_order_client_phone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='client_phone_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20, verbose_name='Téléphone normalisé'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='client_search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='Nom client normalisé'),
+        ),
+        migrations.RunPython(fill_client_keys, migrations.RunPython.noop),
+        postgres_search_indexes('orders', ['client_search_name'], ['client_phone_key']),
+    ]
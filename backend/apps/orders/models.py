@@ -8,7 +8,17 @@ from django.utils import timezone
 from decimal import Decimal
 import uuid
 
+from apps.audit.tracking import AuditedManager, audited
+from apps.clients.search import update_client_keys
 
+
+@audited(
+    exclude=[
+        'created_at', 'updated_at', 'synced_at',
+        'client_search_name', 'client_phone_key', 'client'
+    ],
+    critical=['payment_status']
+)
 class Order(models.Model):
     """
     Order model representing a customer order.
@@ -35,6 +45,22 @@ class Order(models.Model):
         MOYENNE = 'moyenne', 'Moyenne'
         HAUTE = 'haute', 'Haute'
 
+    # Board sort order: active orders first, then by priority (see sort_key)
+    STATUS_SORT_ORDER = {
+        DeliveryStatus.NOUVELLE: 1,
+        DeliveryStatus.EN_PREPARATION: 2,
+        DeliveryStatus.EN_COURS: 3,
+        DeliveryStatus.LIVREE: 10,
+        DeliveryStatus.ANNULEE: 11,
+    }
+    STATUS_SORT_DEFAULT = 5
+    PRIORITY_SORT_ORDER = {
+        Priority.HAUTE: 1,
+        Priority.MOYENNE: 2,
+        Priority.BASSE: 3,
+    }
+    PRIORITY_SORT_DEFAULT = 2
+
     # Identifiers
     order_number = models.CharField(
         max_length=20,
@@ -60,6 +86,33 @@ class Order(models.Model):
         verbose_name='Téléphone'
     )
 
+    # Normalized client keys (apps.clients.search), set on save
+    client_search_name = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Nom client normalisé'
+    )
+    client_phone_key = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Téléphone normalisé'
+    )
+
+    # Client directory entry (apps.clients), linked from the phone number
+    client = models.ForeignKey(
+        'clients.Client',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='orders',
+        verbose_name='Client'
+    )
+
     # Delivery information
     delivery_address = models.TextField(
         blank=True,
@@ -123,6 +176,8 @@ class Order(models.Model):
         verbose_name='Synchronisé le'
     )
 
+    objects = AuditedManager()
+
     class Meta:
         db_table = 'orders'
         verbose_name = 'Commande'
@@ -133,6 +188,7 @@ class Order(models.Model):
         return f"{self.order_number} - {self.client_name}"
 
     def save(self, *args, **kwargs):
+        update_client_keys(self, kwargs)
         if not self.order_number:
             self.order_number = self._generate_order_number()
         super().save(*args, **kwargs)
@@ -161,6 +217,18 @@ class Order(models.Model):
         self.total_price = total
         return total
 
+    @property
+    def sort_key(self):
+        """
+        Position of the order on the board, matching the default API
+        ordering `status_order, priority_order, -created_at`.
+        """
+        return [
+            self.STATUS_SORT_ORDER.get(self.delivery_status, self.STATUS_SORT_DEFAULT),
+            self.PRIORITY_SORT_ORDER.get(self.priority, self.PRIORITY_SORT_DEFAULT),
+            self.created_at.isoformat() if self.created_at else None,
+        ]
+
     @property
     def is_delivered(self):
         return self.delivery_status == self.DeliveryStatus.LIVREE
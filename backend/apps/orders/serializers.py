@@ -3,9 +3,10 @@ Serializers for Order and OrderItem models.
 """
 
 from rest_framework import serializers
+from django.conf import settings
 from django.db import transaction
 from .models import Order, OrderItem
-from apps.products.models import Product
+from apps.products.identity import get_product_map, preload_products
 from apps.products.serializers import ProductSimpleSerializer
 
 
@@ -29,12 +30,14 @@ class OrderItemCreateSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=1)
 
     def validate_product_id(self, value):
-        try:
-            product = Product.objects.get(id=value, is_active=True)
-        except Product.DoesNotExist:
+        if get_product_map(self.context).get_active(value) is None:
             raise serializers.ValidationError("Produit non trouvé ou inactif.")
         return value
 
+    def validate(self, data):
+        data['product'] = get_product_map(self.context).get(data['product_id'])
+        return data
+
 
 class OrderSerializer(serializers.ModelSerializer):
     """Serializer for Order with full details."""
@@ -63,7 +66,7 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = [
             'id', 'order_number', 'local_id',
-            'client_name', 'client_phone',
+            'client_name', 'client_phone', 'client',
             'delivery_address', 'delivery_date',
             'delivery_status', 'delivery_status_display',
             'payment_status', 'payment_status_display',
@@ -142,6 +145,12 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             print(f"Invalid UUID '{value}', generating new one")
             return str(uuid.uuid4())
 
+    def to_internal_value(self, data):
+        # Load all the products of the order before validating its items
+        if hasattr(data, 'get'):
+            preload_products(self.context, data.get('items'))
+        return super().to_internal_value(data)
+
     def validate_items(self, value):
         if not value:
             raise serializers.ValidationError("La commande doit contenir au moins un produit.")
@@ -165,10 +174,10 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
 
-        # Create order items
+        # Create order items (products loaded during validation)
         total = 0
         for item_data in items_data:
-            product = Product.objects.get(id=item_data['product_id'])
+            product = item_data['product']
             item = OrderItem.objects.create(
                 order=order,
                 product=product,
@@ -200,6 +209,16 @@ class OrderStatusSerializer(serializers.Serializer):
     delivery_status = serializers.ChoiceField(choices=Order.DeliveryStatus.choices)
 
 
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """Serializer for updating the delivery status of several orders."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.ORDER_BULK_MAX_SIZE
+    )
+    delivery_status = serializers.ChoiceField(choices=Order.DeliveryStatus.choices)
+
+
 class OrderPaymentSerializer(serializers.Serializer):
     """Serializer for updating payment status only."""
     payment_status = serializers.ChoiceField(choices=Order.PaymentStatus.choices)
@@ -209,6 +228,16 @@ class OrderSyncSerializer(serializers.Serializer):
     """Serializer for syncing multiple orders from mobile."""
     orders = OrderCreateSerializer(many=True)
 
+    def to_internal_value(self, data):
+        # Load the products of every order at once
+        if hasattr(data, 'get') and isinstance(data.get('orders'), list):
+            preload_products(self.context, [
+                item
+                for order in data['orders'] if isinstance(order, dict)
+                for item in (order.get('items') if isinstance(order.get('items'), list) else [])
+            ])
+        return super().to_internal_value(data)
+
     def create(self, validated_data):
         orders_data = validated_data.get('orders', [])
         created_orders = []
@@ -0,0 +1,69 @@
+"""
+Order services.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order
+
+
+@transaction.atomic
+def bulk_update_status(order_ids, delivery_status, user):
+    """
+    Move several orders to `delivery_status` in one transaction.
+
+    Does what saving each order would (audit entries, board updates,
+    client aggregates, stock decrement on delivery) with bulk writes, and
+    notifies deliveries once for all the orders. Cancelled orders are
+    left as they are, as with the single order endpoint.
+
+    Args:
+        order_ids: Ids of the orders to update
+        delivery_status: New delivery status
+        user: User making the change
+
+    Returns:
+        Dict of order ids: updated, unchanged, cancelled and not_found
+    """
+    from apps.clients.services import refresh_clients
+    from apps.notifications.services import (
+        create_orders_delivered_notification, send_order_updates
+    )
+    from apps.stock.services import decrement_stock_for_orders
+
+    orders = Order.objects.select_for_update().order_by('pk').in_bulk(set(order_ids))
+    report = {
+        'updated': [],
+        'unchanged': [],
+        'cancelled': [],
+        'not_found': sorted(set(order_ids) - set(orders)),
+    }
+
+    updated = []
+    now = timezone.now()
+    for order in orders.values():
+        if order.is_cancelled:
+            report['cancelled'].append(order.pk)
+        elif order.delivery_status == delivery_status:
+            report['unchanged'].append(order.pk)
+        else:
+            order.delivery_status = delivery_status
+            order.updated_at = now
+            updated.append(order)
+            report['updated'].append(order.pk)
+    if not updated:
+        return report
+
+    # Audited through AuditedManager.bulk_update (one entry per order)
+    Order.objects.bulk_update(updated, ['delivery_status', 'updated_at'])
+
+    # bulk_update() sends no post_save: do what the order signals do
+    send_order_updates(updated, {'delivery_status': delivery_status})
+    refresh_clients({order.client_id for order in updated if order.client_id})
+
+    if delivery_status == Order.DeliveryStatus.LIVREE:
+        decrement_stock_for_orders(updated, user)
+        create_orders_delivered_notification(updated)
+
+    return report
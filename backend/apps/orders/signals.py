@@ -1,24 +1,51 @@
 """
 Signals for Order model.
-Handles automatic stock decrement on delivery.
+Handles automatic stock decrement on delivery and live board updates.
 """
 
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from .models import Order
 
+# Fields sent to the live order board when they change
+BOARD_FIELDS = [
+    'delivery_status', 'payment_status', 'priority', 'delivery_date',
+    'total_price', 'client_name', 'client_phone', 'delivery_address'
+]
+
 
 @receiver(pre_save, sender=Order)
 def capture_previous_status(sender, instance, **kwargs):
-    """Capture previous delivery status before save."""
+    """Capture previous delivery status and board fields before save."""
+    instance._previous_delivery_status = None
+    instance._previous_board_values = None
     if instance.pk:
-        try:
-            previous = Order.objects.get(pk=instance.pk)
-            instance._previous_delivery_status = previous.delivery_status
-        except Order.DoesNotExist:
-            instance._previous_delivery_status = None
-    else:
-        instance._previous_delivery_status = None
+        previous = Order.objects.filter(pk=instance.pk).values(*BOARD_FIELDS).first()
+        if previous is not None:
+            instance._previous_delivery_status = previous['delivery_status']
+            instance._previous_board_values = previous
+
+
+def _board_changes(instance, created):
+    """Board fields changed by this save, with their new values."""
+    previous = getattr(instance, '_previous_board_values', None)
+    if created or previous is None:
+        return {field: getattr(instance, field) for field in BOARD_FIELDS}
+    return {
+        field: getattr(instance, field)
+        for field in BOARD_FIELDS
+        if getattr(instance, field) != previous[field]
+    }
+
+
+@receiver(post_save, sender=Order)
+def publish_order_update(sender, instance, created, **kwargs):
+    """Publish changed board fields on the order_update channel."""
+    from apps.notifications.services import send_order_update
+
+    changes = _board_changes(instance, created)
+    if changes:
+        send_order_update(instance, changes, created=created)
 
 
 @receiver(post_save, sender=Order)
@@ -41,8 +68,8 @@ def handle_order_status_change(sender, instance, created, **kwargs):
                 instance.delivery_status == Order.DeliveryStatus.LIVREE):
 
             # Auto-decrement stock
-            from apps.stock.services import decrement_stock_for_order
-            decrement_stock_for_order(instance, instance.created_by)
+            from apps.stock.services import decrement_stock_for_order, delivered_by
+            decrement_stock_for_order(instance, delivered_by(instance))
 
             # Send notification
             from apps.notifications.services import create_order_delivered_notification
@@ -12,12 +12,15 @@ from django.utils import timezone
 from django.db.models import Count, Case, When, IntegerField, Q
 
 from .models import Order, OrderItem
+from apps.clients.search import search_clients
 from .serializers import (
     OrderSerializer, OrderListSerializer, OrderCreateSerializer,
     OrderUpdateSerializer, OrderStatusSerializer, OrderPaymentSerializer,
-    OrderSyncSerializer
+    OrderSyncSerializer, OrderBulkStatusSerializer
 )
+from .services import bulk_update_status
 from apps.users.permissions import IsVendorOrOrderManager, IsOrderManager
+from utils.search import parse_limit
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -43,20 +46,16 @@ class OrderViewSet(viewsets.ModelViewSet):
             items_count=Count('items'),
             # Status order: commandes actives en haut (valeur basse), terminées en bas (valeur haute)
             status_order=Case(
-                When(delivery_status='nouvelle', then=1),
-                When(delivery_status='en_preparation', then=2),
-                When(delivery_status='en_cours', then=3),
-                When(delivery_status='livree', then=10),
-                When(delivery_status='annulee', then=11),
-                default=5,
+                *[When(delivery_status=value, then=rank)
+                  for value, rank in Order.STATUS_SORT_ORDER.items()],
+                default=Order.STATUS_SORT_DEFAULT,
                 output_field=IntegerField(),
             ),
             # Priority order: haute=1, moyenne=2, basse=3
             priority_order=Case(
-                When(priority='haute', then=1),
-                When(priority='moyenne', then=2),
-                When(priority='basse', then=3),
-                default=2,
+                *[When(priority=value, then=rank)
+                  for value, rank in Order.PRIORITY_SORT_ORDER.items()],
+                default=Order.PRIORITY_SORT_DEFAULT,
                 output_field=IntegerField(),
             )
         ).select_related('created_by')
@@ -87,6 +86,8 @@ class OrderViewSet(viewsets.ModelViewSet):
             return OrderUpdateSerializer
         if self.action == 'update_status':
             return OrderStatusSerializer
+        if self.action == 'bulk_status':
+            return OrderBulkStatusSerializer
         if self.action == 'update_payment':
             return OrderPaymentSerializer
         if self.action == 'sync':
@@ -95,7 +96,7 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         # Lecture: tous les utilisateurs authentifiés
-        if self.action in ['list', 'retrieve', 'pending', 'unpaid', 'today', 'stats']:
+        if self.action in ['list', 'retrieve', 'pending', 'unpaid', 'today', 'stats', 'clients']:
             return [IsAuthenticated()]
         # Création: vendeurs + gestionnaires commandes + admin
         if self.action in ['create', 'sync']:
@@ -118,25 +119,32 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        old_status = order.delivery_status
         new_status = serializer.validated_data['delivery_status']
 
+        # The change is audited automatically (see apps.audit.tracking)
         order.delivery_status = new_status
         order.save()
 
-        # Log the change
-        from apps.audit.models import AuditLog
-        AuditLog.objects.create(
-            user=request.user,
-            action=AuditLog.Action.UPDATE,
-            entity_type='Order',
-            entity_id=str(order.id),
-            old_values={'delivery_status': old_status},
-            new_values={'delivery_status': new_status}
-        )
-
         return Response(OrderSerializer(order).data)
 
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """
+        Update the delivery status of several orders at once.
+
+        Body: {"ids": [1, 2, 3], "delivery_status": "livree"}
+        Cancelled orders are not modified.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        report = bulk_update_status(
+            serializer.validated_data['ids'],
+            serializer.validated_data['delivery_status'],
+            request.user
+        )
+        return Response(report)
+
     @action(detail=True, methods=['patch'])
     def update_payment(self, request, pk=None):
         """Update payment status."""
@@ -144,23 +152,12 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        old_status = order.payment_status
         new_status = serializer.validated_data['payment_status']
 
+        # The change is audited automatically, synchronously for payments
         order.payment_status = new_status
         order.save()
 
-        # Log the change
-        from apps.audit.models import AuditLog
-        AuditLog.objects.create(
-            user=request.user,
-            action=AuditLog.Action.UPDATE,
-            entity_type='Order',
-            entity_id=str(order.id),
-            old_values={'payment_status': old_status},
-            new_values={'payment_status': new_status}
-        )
-
         return Response(OrderSerializer(order).data)
 
     @action(detail=False, methods=['post'])
@@ -180,6 +177,19 @@ class OrderViewSet(viewsets.ModelViewSet):
             'orders': OrderListSerializer(orders, many=True).data
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['get'])
+    def clients(self, request):
+        """
+        Client autocomplete (see apps.clients.search).
+
+        ?q= matches the start of name words (accents ignored) or, for
+        digits, the start of the phone number.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response([])
+        return Response(search_clients(query, parse_limit(request.query_params.get('limit'))))
+
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get pending orders (not delivered/cancelled)."""
@@ -3,7 +3,7 @@ Admin configuration for Product and Category models.
 """
 
 from django.contrib import admin
-from .models import Product, Category
+from .models import Product, Category, ProductPrice
 
 
 @admin.register(Category)
@@ -26,3 +26,11 @@ class ProductAdmin(admin.ModelAdmin):
         return obj.is_low_stock
     is_low_stock.boolean = True
     is_low_stock.short_description = 'Stock bas'
+
+
+@admin.register(ProductPrice)
+class ProductPriceAdmin(admin.ModelAdmin):
+    list_display = ['product', 'unit_price', 'valid_from', 'valid_to']
+    list_select_related = ['product']
+    search_fields = ['product__name']
+    ordering = ['product__name', '-valid_from']
@@ -0,0 +1,88 @@
+"""
+Barcode resolution for POS scanning.
+
+Barcodes are resolved against the unique index on Product.barcode and
+kept in a per-process LRU cache. Cached entries hold catalogue data only
+(no stock quantity), so the cache is valid for one catalogue version and
+is dropped as soon as the version changes (see catalogue.py). Unknown
+barcodes are cached too: creating a product with that barcode bumps the
+version.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .catalogue import current_version, product_rows
+from .models import Product
+
+# Barcodes accepted by one batch lookup
+MAX_BATCH_SIZE = 500
+
+_MISSING = object()
+
+
+class BarcodeCache:
+    """LRU cache of barcode -> product row (or None) for one catalogue version."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_many(self, barcodes, version):
+        """Cached rows of the barcodes found, for `version`."""
+        found = {}
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            for barcode in barcodes:
+                row = self._entries.get(barcode, _MISSING)
+                if row is not _MISSING:
+                    self._entries.move_to_end(barcode)
+                    found[barcode] = row
+        return found
+
+    def set_many(self, rows, version):
+        max_size = getattr(settings, 'BARCODE_CACHE_SIZE', 5000)
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries.update(rows)
+            for barcode in rows:
+                self._entries.move_to_end(barcode)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+
+cache = BarcodeCache()
+
+
+def normalize_barcode(barcode):
+    return str(barcode).strip()
+
+
+def resolve_barcodes(barcodes):
+    """
+    Resolve barcodes to active products.
+
+    Returns:
+        Dict barcode -> catalogue row, or None for unknown barcodes
+    """
+    barcodes = list(dict.fromkeys(normalize_barcode(b) for b in barcodes if normalize_barcode(b)))
+    version = current_version()
+    results = cache.get_many(barcodes, version)
+
+    missing = [b for b in barcodes if b not in results]
+    if missing:
+        rows = {
+            row['barcode']: row
+            for row in product_rows(Product.objects.filter(barcode__in=missing, is_active=True))
+        }
+        fetched = {barcode: rows.get(barcode) for barcode in missing}
+        cache.set_many(fetched, version)
+        results.update(fetched)
+
+    return {barcode: results[barcode] for barcode in barcodes}
@@ -0,0 +1,190 @@
+"""
+Versioned catalogue snapshot for the apps.
+
+The catalogue (categories and active products, without stock quantities,
+which change all day) has a version: the CatalogueVersion counter. Saving
+a product or category whose catalogue fields changed writes a change row
+(see signals.py); bulk writes call `record_changes()`. Each writing
+transaction bumps the counter under a row lock and tags its change rows
+with the new version.
+
+The full snapshot of a version is built once, gzip-compressed, and kept
+in memory and in CATALOGUE_CACHE_DIR, so every process serves it without
+querying products. Clients send their version back with If-None-Match
+(unchanged catalogue: 304) or `?since=` to receive only the products and
+categories changed since then.
+
+A snapshot built while a change is being committed may already contain
+it under the previous version; the client then receives that change
+again in its next diff, which is harmless.
+"""
+
+import gzip
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Min
+
+from .models import CatalogueChange, CatalogueVersion, Category, Product
+
+VERSION_KEY = 'catalogue:version'
+# Bounds how long a version cached by a racing reader can stay stale
+VERSION_TIMEOUT = 60
+
+PRODUCT_FIELDS = [
+    'id', 'name', 'description', 'unit_price', 'unit', 'category',
+    'barcode', 'min_stock_level', 'expiration_date', 'is_active'
+]
+CATEGORY_FIELDS = ['id', 'name', 'description']
+
+_snapshot = {}
+_lock = threading.Lock()
+
+
+def _database_version():
+    return CatalogueVersion.objects.values_list('value', flat=True).first() or 0
+
+
+def current_version():
+    """Catalogue version, from the cache when possible."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = _database_version()
+        # add(), not set(): never overwrite a version published meanwhile
+        cache.add(VERSION_KEY, version, VERSION_TIMEOUT)
+    return version
+
+
+def _publish_version():
+    cache.set(VERSION_KEY, _database_version(), VERSION_TIMEOUT)
+
+
+def record_changes(entity_type, ids):
+    """Log changed products or categories, bumping the catalogue version."""
+    ids = list(ids)
+    if not ids:
+        return
+    with transaction.atomic():
+        # The row lock is held until commit: the next writer gets a
+        # higher version only once this one is visible
+        counter, _ = CatalogueVersion.objects.select_for_update().get_or_create(pk=1)
+        counter.value += 1
+        counter.save(update_fields=['value'])
+        CatalogueChange.objects.bulk_create([
+            CatalogueChange(entity_type=entity_type, entity_id=entity_id, version=counter.value)
+            for entity_id in ids
+        ])
+    # Publish the committed version instead of deleting the key: a reader
+    # that read the old version before the commit could set it back
+    transaction.on_commit(_publish_version)
+
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+def compress(data):
+    """JSON-encode and gzip a payload."""
+    return gzip.compress(_dumps(data), compresslevel=6)
+
+
+def product_rows(queryset):
+    """Catalogue rows of products, with JSON-ready values as in the API."""
+    rows = list(queryset.order_by('id').values(*PRODUCT_FIELDS))
+    for row in rows:
+        row['unit_price'] = str(row['unit_price'])
+        if row['expiration_date'] is not None:
+            row['expiration_date'] = row['expiration_date'].isoformat()
+    return rows
+
+
+def _categories(queryset):
+    return list(queryset.order_by('id').values(*CATEGORY_FIELDS))
+
+
+def build_snapshot(version):
+    return {
+        'version': version,
+        'full': True,
+        'categories': _categories(Category.objects.all()),
+        'products': product_rows(Product.objects.filter(is_active=True)),
+    }
+
+
+def _cache_path(version):
+    return os.path.join(settings.CATALOGUE_CACHE_DIR, f'catalogue_v{version}.json.gz')
+
+
+def _write_file(version, body):
+    directory = settings.CATALOGUE_CACHE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = _cache_path(version)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    for name in os.listdir(directory):
+        if name.startswith('catalogue_v') and name.endswith('.json.gz') \
+                and os.path.join(directory, name) != path:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def get_snapshot(version):
+    """Gzip-compressed full snapshot of a catalogue version."""
+    if _snapshot.get('version') == version:
+        return _snapshot['body']
+    with _lock:
+        if _snapshot.get('version') == version:
+            return _snapshot['body']
+        try:
+            with open(_cache_path(version), 'rb') as f:
+                body = f.read()
+        except OSError:
+            body = compress(build_snapshot(version))
+            _write_file(version, body)
+        _snapshot.update(version=version, body=body)
+    return body
+
+
+def build_diff(since, version):
+    """
+    Changes between two catalogue versions.
+
+    Returns:
+        Dict with the changed categories and active products and the ids
+        of the removed (or deactivated) ones, or None when the change log
+        no longer covers `since` and a full snapshot is needed
+    """
+    if since <= 0 or since > version:
+        return None
+    oldest = CatalogueChange.objects.aggregate(oldest=Min('version'))['oldest']
+    if oldest is None or oldest > since + 1:
+        return None
+
+    changed = {CatalogueChange.EntityType.PRODUCT: set(), CatalogueChange.EntityType.CATEGORY: set()}
+    for entity_type, entity_id in CatalogueChange.objects.filter(
+        version__gt=since, version__lte=version
+    ).values_list('entity_type', 'entity_id'):
+        changed[entity_type].add(entity_id)
+
+    product_ids = changed[CatalogueChange.EntityType.PRODUCT]
+    category_ids = changed[CatalogueChange.EntityType.CATEGORY]
+    products = product_rows(Product.objects.filter(id__in=product_ids, is_active=True))
+    categories = _categories(Category.objects.filter(id__in=category_ids))
+    return {
+        'version': version,
+        'since': since,
+        'full': False,
+        'categories': categories,
+        'products': products,
+        'removed_categories': sorted(category_ids - {c['id'] for c in categories}),
+        'removed_products': sorted(product_ids - {p['id'] for p in products}),
+    }
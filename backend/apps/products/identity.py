@@ -0,0 +1,57 @@
+"""
+Request-scoped product identity map.
+
+Order, sale and stock serializers reference products by id. They load
+every referenced product in one query when validation starts, through
+the ProductMap kept in the serializer context, and creation code reuses
+those instances instead of fetching them again. A product referenced
+twice in a request is the same instance, so stock changes made through
+one reference are seen by the other.
+"""
+
+from .models import Product
+
+CONTEXT_KEY = 'product_map'
+
+
+class ProductMap:
+    """Products loaded for one request, by id (None when not found)."""
+
+    def __init__(self):
+        self._products = {}
+
+    def load(self, ids):
+        """Load the products of `ids` not loaded yet, in one query."""
+        missing = {pk for pk in ids if pk not in self._products}
+        if missing:
+            found = Product.objects.in_bulk(missing)
+            for pk in missing:
+                self._products[pk] = found.get(pk)
+
+    def get(self, pk):
+        self.load([pk])
+        return self._products[pk]
+
+    def get_active(self, pk):
+        product = self.get(pk)
+        return product if product is not None and product.is_active else None
+
+
+def get_product_map(context):
+    """The ProductMap of a serializer context, created on first use."""
+    return context.setdefault(CONTEXT_KEY, ProductMap())
+
+
+def preload_products(context, items, key='product_id'):
+    """
+    Load the products referenced by raw (not yet validated) `items`.
+
+    Invalid ids are skipped: field validation reports them afterwards.
+    """
+    ids = set()
+    for item in items if isinstance(items, list) else []:
+        try:
+            ids.add(int(item[key]))
+        except (TypeError, ValueError, KeyError):
+            continue
+    get_product_map(context).load(ids)
@@ -0,0 +1,289 @@
+"""
+Bulk product import and price updates.
+
+Rows (JSON list or CSV file) are matched to existing products by barcode,
+then by name (accents and case ignored). Matched products get the columns
+present in the row; other rows create products, which needs at least a
+name and a price. Typical uses:
+
+    name,barcode,unit_price,unit,category      new depot range
+    barcode,unit_price                         price update
+
+Rows are validated one by one and invalid rows are reported with their
+errors; the valid ones are written with chunked bulk_create/bulk_update
+in one transaction, followed by a single catalogue version bump and the
+price history rows of new prices.
+stock_quantity only applies to new products: existing stock changes go
+through stock movements.
+"""
+
+import csv
+import io
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from utils.search import normalize_text
+
+from .catalogue import current_version, record_changes
+from .prices import record_price_changes
+from .models import CatalogueChange, Category, Product
+
+BATCH_SIZE = 500
+
+# Columns that can be written on existing products
+UPDATE_FIELDS = [
+    'name', 'description', 'unit_price', 'unit', 'category', 'barcode',
+    'min_stock_level', 'expiration_date', 'is_active'
+]
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """One import row. No database validators: lookups are done in bulk."""
+    name = serializers.CharField(max_length=200, required=False)
+    description = serializers.CharField(required=False, allow_blank=True)
+    unit_price = serializers.DecimalField(
+        max_digits=10, decimal_places=0, min_value=0, required=False
+    )
+    unit = serializers.ChoiceField(choices=Product.Unit.choices, required=False)
+    category = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    barcode = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    min_stock_level = serializers.IntegerField(required=False)
+    expiration_date = serializers.DateField(required=False, allow_null=True)
+    is_active = serializers.BooleanField(required=False)
+    stock_quantity = serializers.IntegerField(min_value=0, required=False)
+
+    def validate_barcode(self, value):
+        return (value.strip() or None) if value else None
+
+
+class ImportReport:
+    """Outcome of an import, returned to the client."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors = []
+
+    def error(self, row, errors):
+        self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self, dry_run=False):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'errors': self.errors,
+            'dry_run': dry_run,
+            'version': current_version(),
+        }
+
+
+def read_csv(file):
+    """Rows of an uploaded CSV file (comma or semicolon separated), streamed."""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;')
+    except csv.Error:
+        dialect = csv.excel
+    for row in csv.DictReader(text, dialect=dialect):
+        # Empty cells mean "not provided"
+        yield {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and value is not None and value.strip() != ''
+        }
+
+
+class _Categories:
+    """All categories, loaded in one query, by id or name."""
+
+    def __init__(self):
+        self.by_id = {}
+        self.by_name = {}
+        for category in Category.objects.all():
+            self.by_id[str(category.id)] = category
+            self.by_name[normalize_text(category.name)] = category
+
+    def resolve(self, value):
+        value = str(value).strip()
+        return self.by_id.get(value) or self.by_name.get(normalize_text(value))
+
+
+class _Existing:
+    """
+    Existing products matching the rows' barcodes or names, in one query.
+
+    With `lock` they are locked until the import commits, so derived
+    fields (stock_state) are computed from their live stock quantity and
+    concurrent changes are not overwritten with stale values.
+    """
+
+    def __init__(self, rows, lock=False):
+        barcodes = {row['barcode'] for row in rows if row.get('barcode')}
+        names = {normalize_text(row['name']) for row in rows if row.get('name')}
+        self.by_barcode = {}
+        self.by_name = {}
+        products = Product.objects.filter(barcode__in=barcodes) | \
+            Product.objects.filter(search_name__in=names)
+        if lock:
+            products = products.select_for_update()
+        for product in products:
+            if product.barcode:
+                self.by_barcode[product.barcode] = product
+            self.by_name.setdefault(product.search_name, []).append(product)
+
+    def match(self, row):
+        if row.get('barcode') and row['barcode'] in self.by_barcode:
+            return self.by_barcode[row['barcode']], None
+        candidates = self.by_name.get(normalize_text(row.get('name', '')), [])
+        if row.get('barcode'):
+            # A barcode not known yet: only match name homonyms without barcode
+            candidates = [p for p in candidates if not p.barcode]
+        if len(candidates) > 1:
+            return None, 'Plusieurs produits portent ce nom, préciser le code-barres.'
+        return (candidates[0] if candidates else None), None
+
+
+def _validate(rows, report):
+    """Rows that pass field validation, with their row number (1-based)."""
+    valid = []
+    for number, data in enumerate(rows, start=1):
+        serializer = ProductImportRowSerializer(data=data)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            report.error(number, serializer.errors)
+    return valid
+
+
+def _plan(valid, categories, existing, report, now):
+    """
+    Match validated rows with existing products.
+
+    Returns:
+        (products to create, products to update by id, updated fields)
+    """
+    to_create, to_update, update_fields = [], {}, set()
+    seen_keys, barcodes_taken = set(), set(existing.by_barcode)
+    # Row number that matched each existing product (by barcode or name)
+    matched_rows = {}
+    for number, data in valid:
+        if 'category' in data:
+            category_value = data.pop('category')
+            category = categories.resolve(category_value) if category_value else None
+            if category_value and category is None:
+                report.error(number, {'category': [f'Catégorie inconnue: {category_value}']})
+                continue
+            data['category'] = category
+
+        key = data.get('barcode') or normalize_text(data.get('name', ''))
+        if not key:
+            report.error(number, {'detail': ['Code-barres ou nom requis.']})
+            continue
+        if key in seen_keys:
+            report.error(number, {'detail': ['Produit déjà présent plus haut dans le fichier.']})
+            continue
+        seen_keys.add(key)
+
+        product, error = existing.match(data)
+        if error:
+            report.error(number, {'detail': [error]})
+            continue
+        if product is not None:
+            if product.pk in matched_rows:
+                report.error(number, {'detail': [
+                    f'Produit déjà modifié par la ligne {matched_rows[product.pk]}.'
+                ]})
+                continue
+            matched_rows[product.pk] = number
+
+        if product is None:
+            missing = [field for field in ('name', 'unit_price') if field not in data]
+            if missing:
+                report.error(number, {field: ['Ce champ est obligatoire.'] for field in missing})
+                continue
+            if data.get('barcode') and data['barcode'] in barcodes_taken:
+                report.error(number, {'barcode': ['Ce code-barres est déjà utilisé.']})
+                continue
+            if data.get('barcode'):
+                barcodes_taken.add(data['barcode'])
+            product = Product(**data)
+            product.refresh_derived_fields()
+            to_create.append(product)
+            continue
+
+        if data.get('barcode') and data['barcode'] != product.barcode:
+            if data['barcode'] in barcodes_taken:
+                report.error(number, {'barcode': ['Ce code-barres est déjà utilisé.']})
+                continue
+            barcodes_taken.add(data['barcode'])
+        data.pop('stock_quantity', None)
+        changed = [
+            field for field in UPDATE_FIELDS
+            if field in data and getattr(product, field) != data[field]
+        ]
+        if not changed:
+            report.unchanged += 1
+            continue
+        for field in changed:
+            setattr(product, field, data[field])
+        product._import_changed = changed
+        product.refresh_derived_fields()
+        product.updated_at = now
+        update_fields.update(changed)
+        to_update[product.pk] = product
+    return to_create, to_update, update_fields
+
+
+def import_products(rows, dry_run=False):
+    """
+    Create or update products from rows of field values.
+
+    Returns:
+        ImportReport
+    """
+    report = ImportReport()
+    max_rows = getattr(settings, 'PRODUCT_IMPORT_MAX_ROWS', 10000)
+    rows = list(rows)
+    if len(rows) > max_rows:
+        report.error(None, {'detail': f'{max_rows} lignes maximum par import.'})
+        return report
+
+    valid = _validate(rows, report)
+    categories = _Categories()
+
+    with transaction.atomic():
+        existing = _Existing([data for _, data in valid], lock=not dry_run)
+        now = timezone.now()
+        to_create, to_update, update_fields = _plan(valid, categories, existing, report, now)
+
+        report.created = len(to_create)
+        report.updated = len(to_update)
+        if dry_run or not (to_create or to_update):
+            return report
+
+        if 'name' in update_fields:
+            update_fields.add('search_name')
+        if 'min_stock_level' in update_fields:
+            update_fields.add('stock_state')
+        created = Product.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        if to_update:
+            Product.objects.bulk_update(
+                list(to_update.values()), sorted(update_fields | {'updated_at'}),
+                batch_size=BATCH_SIZE
+            )
+        record_changes(
+            CatalogueChange.EntityType.PRODUCT,
+            [product.pk for product in created] + list(to_update)
+        )
+        record_price_changes(created + [
+            product for product in to_update.values()
+            if 'unit_price' in product._import_changed
+        ], at=now)
+    return report
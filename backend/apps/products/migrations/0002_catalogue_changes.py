@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('product', 'Produit'), ('category', 'Catégorie')], max_length=20, verbose_name="Type d'entité")),
+                ('entity_id', models.BigIntegerField(verbose_name='ID entité')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Créé le')),
+            ],
+            options={
+                'verbose_name': 'Modification du catalogue',
+                'verbose_name_plural': 'Modifications du catalogue',
+                'db_table': 'catalogue_changes',
+                'indexes': [models.Index(fields=['created_at'], name='catalogue_change_created_idx')],
+            },
+        ),
+    ]
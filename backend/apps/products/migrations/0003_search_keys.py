@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:33
+
+from django.db import migrations, models
+
+from utils.search import normalize_text, postgres_search_indexes
+
+
+def fill_search_names(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    rows = list(Product.objects.only('name'))
+    for row in rows:
+        row.search_name = normalize_text(row.name)
+    Product.objects.bulk_update(rows, ['search_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_catalogue_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='Nom normalisé'),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+        postgres_search_indexes('products', ['search_name']),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:37
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+
+def fill_stock_state(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Product.objects.update(stock_state=Case(
+        When(stock_quantity__lte=0, then=Value('out')),
+        When(stock_quantity__lte=F('min_stock_level'), then=Value('low')),
+        default=Value('ok'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_state',
+            field=models.CharField(choices=[('ok', 'En stock'), ('low', 'Stock bas'), ('out', 'Rupture')], default='out', editable=False, max_length=10, verbose_name='État du stock'),
+        ),
+        migrations.RunPython(fill_stock_state, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['stock_state'], name='product_active_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('expiration_date__isnull', False), ('is_active', True)), fields=['expiration_date'], name='product_active_expiry_idx'),
+        ),
+    ]
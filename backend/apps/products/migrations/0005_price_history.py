@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def open_current_prices(apps, schema_editor):
+    # The price in effect before the history existed is assumed to date
+    # from the product's creation
+    Product = apps.get_model('products', 'Product')
+    ProductPrice = apps.get_model('products', 'ProductPrice')
+    ProductPrice.objects.bulk_create([
+        ProductPrice(product_id=pk, unit_price=unit_price, valid_from=created_at)
+        for pk, unit_price, created_at in Product.objects.values_list('pk', 'unit_price', 'created_at')
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_stock_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_price', models.DecimalField(decimal_places=0, max_digits=10, verbose_name='Prix unitaire (FCFA)')),
+                ('valid_from', models.DateTimeField(verbose_name='Valable à partir du')),
+                ('valid_to', models.DateTimeField(blank=True, null=True, verbose_name="Valable jusqu'au")),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='products.product', verbose_name='Produit')),
+            ],
+            options={
+                'verbose_name': 'Historique de prix',
+                'verbose_name_plural': 'Historique des prix',
+                'db_table': 'product_prices',
+                'ordering': ['product', '-valid_from'],
+                'indexes': [models.Index(fields=['product', 'valid_from', 'valid_to'], name='product_price_range_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('valid_to__isnull', True)), fields=('product',), name='unique_current_product_price')],
+            },
+        ),
+        migrations.RunPython(open_current_prices, migrations.RunPython.noop),
+    ]
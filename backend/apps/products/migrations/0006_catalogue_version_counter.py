@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:04
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def start_counter(apps, schema_editor):
+    # Existing change rows keep their id as version, so clients at the
+    # current version are not sent a full snapshot
+    CatalogueChange = apps.get_model('products', 'CatalogueChange')
+    CatalogueVersion = apps.get_model('products', 'CatalogueVersion')
+    CatalogueChange.objects.update(version=F('id'))
+    version = CatalogueChange.objects.aggregate(version=Max('id'))['version'] or 0
+    CatalogueVersion.objects.create(pk=1, value=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_price_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Version du catalogue',
+                'verbose_name_plural': 'Version du catalogue',
+                'db_table': 'catalogue_version',
+            },
+        ),
+        migrations.AddField(
+            model_name='cataloguechange',
+            name='version',
+            field=models.BigIntegerField(default=0, verbose_name='Version'),
+        ),
+        migrations.AddIndex(
+            model_name='cataloguechange',
+            index=models.Index(fields=['version'], name='catalogue_change_version_idx'),
+        ),
+        migrations.RunPython(start_counter, migrations.RunPython.noop),
+    ]
@@ -6,7 +6,11 @@ from django.db import models
 from django.utils import timezone
 from datetime import timedelta
 
+from apps.audit.tracking import AuditedManager, audited
+from utils.search import normalize_text
 
+
+@audited(exclude=['created_at'])
 class Category(models.Model):
     """Product category (e.g., Lait, Yaourt, Fromage, Beurre)."""
 
@@ -21,6 +25,8 @@ class Category(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Créé le')
 
+    objects = AuditedManager()
+
     class Meta:
         db_table = 'categories'
         verbose_name = 'Catégorie'
@@ -31,6 +37,7 @@ class Category(models.Model):
         return self.name
 
 
+@audited(exclude=['created_at', 'updated_at', 'search_name', 'stock_state'])
 class Product(models.Model):
     """Dairy product with stock tracking."""
 
@@ -41,10 +48,23 @@ class Product(models.Model):
         SACHET = 'sachet', 'Sachet(s)'
         POT = 'pot', 'Pot(s)'
 
+    class StockState(models.TextChoices):
+        OK = 'ok', 'En stock'
+        LOW = 'low', 'Stock bas'
+        OUT = 'out', 'Rupture'
+
     name = models.CharField(
         max_length=200,
         verbose_name='Nom'
     )
+    # Normalized name for autocomplete (utils.search), set on save
+    search_name = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Nom normalisé'
+    )
     description = models.TextField(
         blank=True,
         verbose_name='Description'
@@ -58,6 +78,15 @@ class Product(models.Model):
         default=0,
         verbose_name='Quantité en stock'
     )
+    # Derived from stock_quantity and min_stock_level on save, so stock
+    # filters are index scans instead of column-to-column comparisons
+    stock_state = models.CharField(
+        max_length=10,
+        choices=StockState.choices,
+        default=StockState.OUT,
+        editable=False,
+        verbose_name='État du stock'
+    )
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -95,18 +124,57 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Créé le')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Modifié le')
 
+    objects = AuditedManager()
+
     class Meta:
         db_table = 'products'
         verbose_name = 'Produit'
         verbose_name_plural = 'Produits'
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['stock_state'],
+                name='product_active_stock_idx',
+                condition=models.Q(is_active=True)
+            ),
+            models.Index(
+                fields=['expiration_date'],
+                name='product_active_expiry_idx',
+                condition=models.Q(is_active=True, expiration_date__isnull=False)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.stock_quantity} {self.get_unit_display()})"
 
+    def save(self, *args, **kwargs):
+        self.refresh_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'name' in update_fields:
+                update_fields.add('search_name')
+            if update_fields & {'stock_quantity', 'min_stock_level'}:
+                update_fields.add('stock_state')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def refresh_derived_fields(self):
+        """Set search_name and stock_state (also needed before bulk writes)."""
+        self.search_name = normalize_text(self.name)
+        self.stock_state = self.compute_stock_state()
+
+    def compute_stock_state(self):
+        """Stock state matching is_out_of_stock / is_low_stock."""
+        if self.stock_quantity <= 0:
+            return self.StockState.OUT
+        if self.stock_quantity <= self.min_stock_level:
+            return self.StockState.LOW
+        return self.StockState.OK
+
     @property
     def is_low_stock(self):
-        """Check if stock is below minimum threshold."""
+        """Check if stock is below minimum threshold (out of stock included)."""
         return self.stock_quantity <= self.min_stock_level
 
     @property
@@ -135,3 +203,106 @@ class Product(models.Model):
             delta = self.expiration_date - timezone.now().date()
             return delta.days
         return None
+
+
+class CatalogueChange(models.Model):
+    """
+    Catalogue change log entry.
+
+    One row is written per product or category whose catalogue data
+    changed (stock quantities excluded), with the catalogue version its
+    transaction was given (see CatalogueVersion).
+    """
+
+    class EntityType(models.TextChoices):
+        PRODUCT = 'product', 'Produit'
+        CATEGORY = 'category', 'Catégorie'
+
+    entity_type = models.CharField(
+        max_length=20,
+        choices=EntityType.choices,
+        verbose_name='Type d\'entité'
+    )
+    entity_id = models.BigIntegerField(verbose_name='ID entité')
+    version = models.BigIntegerField(default=0, verbose_name='Version')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Créé le')
+
+    class Meta:
+        db_table = 'catalogue_changes'
+        verbose_name = 'Modification du catalogue'
+        verbose_name_plural = 'Modifications du catalogue'
+        indexes = [
+            models.Index(fields=['created_at'], name='catalogue_change_created_idx'),
+            models.Index(fields=['version'], name='catalogue_change_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"v{self.version} {self.entity_type} #{self.entity_id}"
+
+
+class CatalogueVersion(models.Model):
+    """
+    Catalogue version counter (a single row).
+
+    Incremented under a row lock by the transaction writing the change
+    rows, so the lock is held until commit: versions become visible in
+    the order they were given, unlike auto-increment ids, and a client
+    at version N never misses a change committed later with version <= N.
+    """
+
+    value = models.BigIntegerField(default=0, verbose_name='Version')
+
+    class Meta:
+        db_table = 'catalogue_version'
+        verbose_name = 'Version du catalogue'
+        verbose_name_plural = 'Version du catalogue'
+
+    def __str__(self):
+        return f"v{self.value}"
+
+
+class ProductPrice(models.Model):
+    """
+    Unit price of a product over a period.
+
+    The row in effect at time t has valid_from <= t < valid_to (valid_to
+    is null for the current price). Rows are written by prices.py
+    whenever Product.unit_price changes.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='prices',
+        verbose_name='Produit'
+    )
+    unit_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=0,
+        verbose_name='Prix unitaire (FCFA)'
+    )
+    valid_from = models.DateTimeField(verbose_name='Valable à partir du')
+    valid_to = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Valable jusqu\'au'
+    )
+
+    class Meta:
+        db_table = 'product_prices'
+        verbose_name = 'Historique de prix'
+        verbose_name_plural = 'Historique des prix'
+        ordering = ['product', '-valid_from']
+        indexes = [
+            models.Index(fields=['product', 'valid_from', 'valid_to'], name='product_price_range_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product'],
+                condition=models.Q(valid_to__isnull=True),
+                name='unique_current_product_price'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.unit_price} FCFA depuis {self.valid_from:%Y-%m-%d}"
@@ -0,0 +1,111 @@
+"""
+Product price history and price lookups.
+
+`record_price_changes()` closes the current ProductPrice row of each
+product and opens a new one at the product's unit_price, under a lock on
+the product. It is called by the product signals and by bulk imports.
+
+`prices_at()` resolves the prices of many products at a given time in
+one query over the (product, valid_from, valid_to) index.
+`current_prices()` serves the order and sale creation paths from a
+per-process cache. A price change bumps the catalogue version (see
+catalogue.py), which drops the cache.
+"""
+
+import threading
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .catalogue import current_version
+from .models import Product, ProductPrice
+
+
+def record_price_changes(products, at=None):
+    """
+    Close the current price rows of `products` and open new ones at the
+    unit price stored in the database.
+
+    The products are locked first: concurrent price changes of a product
+    are then recorded one after the other (the second closes the row the
+    first opened) instead of both trying to open a current row.
+    """
+    ids = sorted({product.pk for product in products if product.pk})
+    if not ids:
+        return
+    with transaction.atomic():
+        prices = dict(
+            Product.objects.select_for_update().filter(pk__in=ids)
+            .order_by('pk').values_list('pk', 'unit_price')
+        )
+        at = at or timezone.now()
+        current = dict(
+            ProductPrice.objects.filter(product_id__in=ids, valid_to__isnull=True)
+            .values_list('product_id', 'unit_price')
+        )
+        changed = [pk for pk, price in prices.items() if current.get(pk) != price]
+        if not changed:
+            return
+        ProductPrice.objects.filter(
+            product_id__in=changed,
+            valid_to__isnull=True
+        ).update(valid_to=at)
+        ProductPrice.objects.bulk_create([
+            ProductPrice(product_id=pk, unit_price=prices[pk], valid_from=at)
+            for pk in changed
+        ], batch_size=500)
+
+
+def prices_at(product_ids, at):
+    """
+    Prices in effect at `at`.
+
+    Returns:
+        Dict product id -> unit price (products without a price at that
+        time are missing)
+    """
+    return dict(
+        ProductPrice.objects.filter(
+            product_id__in=product_ids,
+            valid_from__lte=at
+        ).filter(
+            Q(valid_to__isnull=True) | Q(valid_to__gt=at)
+        ).values_list('product_id', 'unit_price')
+    )
+
+
+class _CurrentPrices:
+    """Per-process cache of current prices for one catalogue version."""
+
+    def __init__(self):
+        self._prices = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_many(self, product_ids):
+        version = current_version()
+        with self._lock:
+            if version != self._version:
+                self._prices = {}
+                self._version = version
+            found = {pid: self._prices[pid] for pid in product_ids if pid in self._prices}
+
+        missing = [pid for pid in product_ids if pid not in found]
+        if missing:
+            loaded = dict(
+                Product.objects.filter(id__in=missing).values_list('id', 'unit_price')
+            )
+            with self._lock:
+                if version == self._version:
+                    self._prices.update(loaded)
+            found.update(loaded)
+        return found
+
+
+_current = _CurrentPrices()
+
+
+def current_prices(product_ids):
+    """Current unit price of each product, without a query when cached."""
+    return _current.get_many(list(product_ids))
@@ -0,0 +1,15 @@
+"""
+Retention policy for the catalogue change log (see utils/retention.py).
+
+Apps whose version is older than the remaining log download the full
+catalogue instead of a diff.
+"""
+
+from utils.retention import RetentionPolicy, register
+
+register(RetentionPolicy(
+    'catalogue_changes',
+    'products.CatalogueChange',
+    'created_at',
+    days=30
+))
@@ -0,0 +1,45 @@
+"""
+Product autocomplete (see utils.search).
+
+The in-memory index used on SQLite holds active product names only and
+follows the catalogue version, so it is rebuilt after catalogue changes
+but not after stock movements.
+"""
+
+from django.db.models import Case, IntegerField, Value, When
+
+from utils.search import (
+    PrefixIndex, get_prefix_index, normalize_text, use_database_index, word_prefix_filter
+)
+
+from .catalogue import current_version
+from .models import Product
+
+
+def _build_index():
+    index = PrefixIndex()
+    for product_id, search_name in Product.objects.filter(is_active=True).values_list('id', 'search_name'):
+        index.add(product_id, search_name)
+    return index
+
+
+def search_products(query, limit):
+    """Active products whose name words start with the query words, best first."""
+    key = normalize_text(query)
+    if not key:
+        return []
+    if use_database_index():
+        return list(
+            Product.objects.filter(is_active=True)
+            .filter(word_prefix_filter('search_name', query))
+            .annotate(rank=Case(
+                When(search_name__startswith=key, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            ))
+            .order_by('rank', 'search_name')[:limit]
+        )
+
+    ids = get_prefix_index('products', current_version(), _build_index).search(key, limit)
+    products = Product.objects.in_bulk(ids)
+    return [products[product_id] for product_id in ids if product_id in products]
@@ -3,7 +3,7 @@ Serializers for Product and Category models.
 """
 
 from rest_framework import serializers
-from .models import Product, Category
+from .models import Product, Category, ProductPrice
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -16,6 +16,9 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
     def get_products_count(self, obj):
+        """Get active products count from annotation or compute directly."""
+        if hasattr(obj, 'products_count'):
+            return obj.products_count
         return obj.products.filter(is_active=True).count()
 
 
@@ -35,7 +38,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'unit_price', 'stock_quantity',
             'category', 'category_name', 'unit', 'unit_display',
             'barcode', 'min_stock_level', 'expiration_date',
-            'is_active', 'is_low_stock', 'is_out_of_stock',
+            'is_active', 'stock_state', 'is_low_stock', 'is_out_of_stock',
             'is_expired', 'is_expiring_soon', 'days_until_expiration',
             'created_at', 'updated_at'
         ]
@@ -80,7 +83,7 @@ class ProductListSerializer(serializers.ModelSerializer):
             'id', 'name', 'unit_price', 'stock_quantity',
             'category', 'category_name', 'unit', 'unit_display',
             'barcode', 'min_stock_level', 'expiration_date',
-            'is_low_stock', 'is_out_of_stock', 'is_active',
+            'stock_state', 'is_low_stock', 'is_out_of_stock', 'is_active',
             'is_expired', 'is_expiring_soon', 'days_until_expiration'
         ]
 
@@ -91,3 +94,19 @@ class ProductSimpleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'unit_price', 'stock_quantity', 'unit']
+
+
+class ProductPriceSerializer(serializers.ModelSerializer):
+    """Serializer for price history rows."""
+
+    class Meta:
+        model = ProductPrice
+        fields = ['id', 'unit_price', 'valid_from', 'valid_to']
+
+
+class CategoryNestedSerializer(CategorySerializer):
+    """Category with its active products, for the catalogue screen."""
+    products = ProductSimpleSerializer(source='active_products', many=True, read_only=True)
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['products']
@@ -0,0 +1,64 @@
+"""
+Signals for Product and Category models.
+Bump the catalogue version when catalogue data changes and keep the
+price history.
+"""
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from apps.audit.tracking import changed_fields
+
+from .catalogue import record_changes
+from .prices import record_price_changes
+from .models import CatalogueChange, Category, Product
+
+# Stock quantities change all day and are not part of the catalogue
+IGNORED_FIELDS = {'stock_quantity'}
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Category)
+def capture_catalogue_changes(sender, instance, **kwargs):
+    """Flag saves that change catalogue fields."""
+    changed = changed_fields(instance) if instance.pk else None
+    instance._catalogue_changed = changed is None or bool(set(changed) - IGNORED_FIELDS)
+    instance._price_changed = changed is None or 'unit_price' in changed
+
+
+@receiver(post_save, sender=Product)
+def record_product_change(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_catalogue_changed', True):
+        record_changes(CatalogueChange.EntityType.PRODUCT, [instance.pk])
+
+
+@receiver(post_save, sender=Product)
+def record_price_change(sender, instance, raw=False, **kwargs):
+    """Keep the price history in step with unit_price."""
+    if not raw and getattr(instance, '_price_changed', True):
+        record_price_changes([instance])
+
+
+@receiver(post_save, sender=Category)
+def record_category_change(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_catalogue_changed', True):
+        record_changes(CatalogueChange.EntityType.CATEGORY, [instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def record_product_deletion(sender, instance, **kwargs):
+    record_changes(CatalogueChange.EntityType.PRODUCT, [instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def record_category_products(sender, instance, **kwargs):
+    """Products lose their category without being saved."""
+    record_changes(
+        CatalogueChange.EntityType.PRODUCT,
+        Product.objects.filter(category=instance).values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def record_category_deletion(sender, instance, **kwargs):
+    record_changes(CatalogueChange.EntityType.CATEGORY, [instance.pk])
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import barcodes
+from .imports import import_products
+from .models import Product
+
+
+class ProductImportTests(TestCase):
+
+    def setUp(self):
+        # The catalogue version is cached: start from the database's
+        cache.clear()
+        barcodes.cache = barcodes.BarcodeCache()
+        self.product = Product.objects.create(
+            name='Lait caillé', unit_price=500, barcode='111'
+        )
+
+    def test_rows_matching_the_same_product_are_reported(self):
+        report = import_products([
+            {'barcode': '111', 'unit_price': '600'},
+            {'name': 'lait caille', 'unit_price': '700'},
+        ])
+
+        self.assertEqual(report.updated, 1)
+        self.assertEqual([error['row'] for error in report.errors], [2])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.unit_price, 600)
+
+    def test_barcode_changes_invalidate_barcode_cache(self):
+        other = Product.objects.create(name='Yaourt nature', unit_price=300)
+        self.assertIsNotNone(barcodes.resolve_barcodes(['111'])['111'])
+        self.assertIsNone(barcodes.resolve_barcodes(['222'])['222'])
+
+        # bulk_update sends no post_save: the catalogue version bumped by
+        # the import, published on commit, must drop the cached rows
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_products([
+                {'barcode': '111', 'is_active': 'false'},
+                {'name': 'Yaourt nature', 'barcode': '222'},
+            ])
+
+        self.assertEqual(report.updated, 2)
+        resolved = barcodes.resolve_barcodes(['111', '222'])
+        self.assertIsNone(resolved['111'])
+        self.assertEqual(resolved['222']['id'], other.pk)
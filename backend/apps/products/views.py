@@ -8,25 +8,67 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.db.models import Count, Prefetch, Q
+from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.cache import patch_vary_headers
 from datetime import timedelta
+import gzip
 
+from . import catalogue, imports, prices
+from .barcodes import MAX_BATCH_SIZE, normalize_barcode, resolve_barcodes
 from .models import Product, Category
+from .search import search_products
 from .serializers import (
     ProductSerializer, ProductCreateSerializer, ProductListSerializer,
-    ProductSimpleSerializer, CategorySerializer
+    ProductSimpleSerializer, ProductPriceSerializer,
+    CategorySerializer, CategoryNestedSerializer
 )
 from apps.users.permissions import IsStockManager, IsAdminOrReadOnly
+from utils.search import parse_limit
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
-    """ViewSet for managing product categories."""
-    queryset = Category.objects.all()
+    """
+    ViewSet for managing product categories.
+
+    Active product counts come from a single annotated query.
+    ?nested=true lists every category with its active products, unpaginated,
+    in two queries.
+    """
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
     filter_backends = [SearchFilter]
     search_fields = ['name']
 
+    @property
+    def nested(self):
+        return self.action == 'list' and self.request.query_params.get('nested') == 'true'
+
+    @property
+    def paginator(self):
+        if self.nested:
+            return None
+        return super().paginator
+
+    def get_queryset(self):
+        queryset = Category.objects.annotate(
+            products_count=Count('products', filter=Q(products__is_active=True))
+        ).order_by('name')
+        if self.nested:
+            queryset = queryset.prefetch_related(Prefetch(
+                'products',
+                queryset=Product.objects.filter(is_active=True).order_by('name'),
+                to_attr='active_products'
+            ))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.nested:
+            return CategoryNestedSerializer
+        return CategorySerializer
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     """
@@ -52,7 +94,10 @@ class ProductViewSet(viewsets.ModelViewSet):
         return ProductSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'simple']:
+        if self.action in [
+            'list', 'retrieve', 'simple', 'catalogue', 'barcode', 'barcodes', 'autocomplete',
+            'unit_prices', 'price_history'
+        ]:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsStockManager()]
 
@@ -63,7 +108,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         low_stock = self.request.query_params.get('low_stock')
         if low_stock == 'true':
             queryset = queryset.filter(
-                stock_quantity__lte=models.F('min_stock_level')
+                stock_state__in=[Product.StockState.LOW, Product.StockState.OUT]
             )
 
         # Filter by expiring soon
@@ -75,7 +120,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         # Filter by out of stock
         out_of_stock = self.request.query_params.get('out_of_stock')
         if out_of_stock == 'true':
-            queryset = queryset.filter(stock_quantity__lte=0)
+            queryset = queryset.filter(stock_state=Product.StockState.OUT)
 
         # By default, only show active products
         show_inactive = self.request.query_params.get('show_inactive')
@@ -94,17 +139,176 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def simple(self, request):
         """Get simplified product list for dropdowns."""
-        products = self.get_queryset().filter(is_active=True, stock_quantity__gt=0)
+        products = self.get_queryset().filter(is_active=True).exclude(
+            stock_state=Product.StockState.OUT
+        )
         serializer = ProductSimpleSerializer(products, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Active products whose name words start with ?q= (accents ignored)."""
+        query = request.query_params.get('q', '').strip()
+        products = search_products(query, parse_limit(request.query_params.get('limit')))
+        return Response(ProductSimpleSerializer(products, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def catalogue(self, request):
+        """
+        Versioned catalogue snapshot (without stock quantities).
+
+        - If-None-Match with the current ETag: 304
+        - ?since=<version>: only what changed since that version
+        - Otherwise the full snapshot, precomputed and gzip-compressed
+        """
+        version = catalogue.current_version()
+        etag = f'"catalogue-{version}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        body = None
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response(
+                    {'detail': 'Version invalide.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            diff = catalogue.build_diff(since, version)
+            if diff is not None:
+                body = catalogue.compress(diff)
+        if body is None:
+            body = catalogue.get_snapshot(version)
+
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(body, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(body), content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    @action(detail=False, methods=['get'], url_path=r'barcode/(?P<code>[^/]+)')
+    def barcode(self, request, code=None):
+        """Resolve a scanned barcode to an active product."""
+        product = resolve_barcodes([code]).get(normalize_barcode(code))
+        if product is None:
+            return Response(
+                {'detail': 'Produit introuvable.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(product)
+
+    @action(detail=False, methods=['post'])
+    def barcodes(self, request):
+        """
+        Resolve many barcodes at once.
+
+        Body: {"barcodes": ["3017620422003", ...]}
+        Unknown barcodes map to null.
+        """
+        codes = request.data.get('barcodes')
+        if not isinstance(codes, list) or not codes:
+            return Response(
+                {'detail': 'Liste de codes-barres requise.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(codes) > MAX_BATCH_SIZE:
+            return Response(
+                {'detail': f'{MAX_BATCH_SIZE} codes-barres maximum par requête.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({
+            'version': catalogue.current_version(),
+            'results': resolve_barcodes(codes),
+        })
+
+    @action(detail=False, methods=['get'], url_path='prices')
+    def unit_prices(self, request):
+        """
+        Unit prices of several products.
+
+        ?ids=1,2,3 (required), ?at=<ISO datetime> for the prices in effect
+        at that time (current prices otherwise). Products without a price
+        are left out.
+        """
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value]
+        except ValueError:
+            ids = None
+        if not ids:
+            return Response(
+                {'detail': 'Liste d\'identifiants de produits requise (ids=1,2,3).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > MAX_BATCH_SIZE:
+            return Response(
+                {'detail': f'{MAX_BATCH_SIZE} produits maximum par requête.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        at = request.query_params.get('at')
+        if at:
+            moment = parse_datetime(at)
+            if moment is None:
+                return Response(
+                    {'detail': 'Date invalide (format ISO 8601 attendu).'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            found = prices.prices_at(ids, moment)
+        else:
+            moment = timezone.now()
+            found = prices.current_prices(ids)
+
+        return Response({
+            'at': moment,
+            'prices': {str(pid): str(price) for pid, price in found.items()},
+        })
+
+    @action(detail=True, methods=['get'])
+    def price_history(self, request, pk=None):
+        """Price history of a product, most recent first."""
+        product = self.get_object()
+        serializer = ProductPriceSerializer(product.prices.all(), many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_products(self, request):
+        """
+        Create or update products in bulk (see imports.py).
+
+        Body: a JSON list of rows ({"rows": [...]} also accepted), or a
+        CSV file uploaded as `file`. ?dry_run=true validates without
+        writing anything.
+        """
+        if 'file' in request.FILES:
+            rows = imports.read_csv(request.FILES['file'])
+        else:
+            rows = request.data.get('rows') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                return Response(
+                    {'detail': 'Liste de produits ou fichier CSV requis.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        dry_run = request.query_params.get('dry_run') == 'true'
+        report = imports.import_products(rows, dry_run=dry_run)
+        return Response(report.as_dict(dry_run=dry_run))
+
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Get products with low stock."""
-        from django.db.models import F
         products = Product.objects.filter(
             is_active=True,
-            stock_quantity__lte=F('min_stock_level')
+            stock_state__in=[Product.StockState.LOW, Product.StockState.OUT]
         ).select_related('category')
         serializer = ProductListSerializer(products, many=True)
         return Response(serializer.data)
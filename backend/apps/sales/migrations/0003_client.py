@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+        ('sales', '0002_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='client',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales', to='clients.client', verbose_name='Client'),
+        ),
+    ]
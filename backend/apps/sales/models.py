@@ -8,7 +8,16 @@ from decimal import Decimal
 from datetime import date
 import uuid
 
+from apps.audit.tracking import AuditedManager, audited
+from apps.clients.search import update_client_keys
 
+
+@audited(
+    exclude=[
+        'created_at', 'updated_at', 'synced_at',
+        'client_search_name', 'client_phone_key', 'client'
+    ]
+)
 class Sale(models.Model):
     """
     Represents a store sale/purchase transaction.
@@ -52,6 +61,33 @@ class Sale(models.Model):
         verbose_name='Téléphone'
     )
 
+    # Normalized client keys (apps.clients.search), set on save
+    client_search_name = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Nom client normalisé'
+    )
+    client_phone_key = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Téléphone normalisé'
+    )
+
+    # Client directory entry (apps.clients), linked from the phone number
+    client = models.ForeignKey(
+        'clients.Client',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='sales',
+        verbose_name='Client'
+    )
+
     # Payment details
     payment_method = models.CharField(
         max_length=20,
@@ -128,6 +164,8 @@ class Sale(models.Model):
         verbose_name='Synchronisé le'
     )
 
+    objects = AuditedManager()
+
     class Meta:
         db_table = 'sales'
         verbose_name = 'Vente'
@@ -138,6 +176,7 @@ class Sale(models.Model):
         return f"{self.receipt_number} - {self.total_amount} FCFA"
 
     def save(self, *args, **kwargs):
+        update_client_keys(self, kwargs)
         if not self.receipt_number:
             self.receipt_number = self._generate_receipt_number()
         self._calculate_totals()
@@ -5,7 +5,7 @@ Serializers for Sales management.
 from rest_framework import serializers
 from decimal import Decimal
 from .models import Sale, SaleItem
-from apps.products.models import Product
+from apps.products.identity import get_product_map, preload_products
 from apps.stock.models import StockMovement
 
 
@@ -30,9 +30,7 @@ class SaleItemCreateSerializer(serializers.Serializer):
     unit_price = serializers.DecimalField(max_digits=10, decimal_places=0, required=False)
 
     def validate_product_id(self, value):
-        try:
-            Product.objects.get(pk=value, is_active=True)
-        except Product.DoesNotExist:
+        if get_product_map(self.context).get_active(value) is None:
             raise serializers.ValidationError("Produit non trouvé ou inactif")
         return value
 
@@ -41,6 +39,10 @@ class SaleItemCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError("La quantité doit être positive")
         return value
 
+    def validate(self, data):
+        data['product'] = get_product_map(self.context).get(data['product_id'])
+        return data
+
 
 class SaleSerializer(serializers.ModelSerializer):
     """Full serializer for Sale with items."""
@@ -54,7 +56,7 @@ class SaleSerializer(serializers.ModelSerializer):
         model = Sale
         fields = [
             'id', 'receipt_number', 'local_id',
-            'client_name', 'client_phone',
+            'client_name', 'client_phone', 'client',
             'payment_method', 'payment_method_display',
             'payment_status', 'payment_status_display',
             'subtotal', 'discount', 'total_amount',
@@ -109,6 +111,12 @@ class SaleCreateSerializer(serializers.ModelSerializer):
             'created_at'
         ]
 
+    def to_internal_value(self, data):
+        # Load all the products of the sale before validating its items
+        if hasattr(data, 'get'):
+            preload_products(self.context, data.get('items'))
+        return super().to_internal_value(data)
+
     def validate_items(self, value):
         if not value:
             raise serializers.ValidationError("La vente doit contenir au moins un article")
@@ -123,11 +131,10 @@ class SaleCreateSerializer(serializers.ModelSerializer):
         items_data = validated_data.pop('items')
         user = self.context['request'].user
 
-        # Calculate subtotal from items
+        # Calculate subtotal from items (products loaded during validation)
         subtotal = Decimal('0')
         for item_data in items_data:
-            product = Product.objects.get(pk=item_data['product_id'])
-            unit_price = item_data.get('unit_price', product.unit_price)
+            unit_price = item_data.get('unit_price', item_data['product'].unit_price)
             subtotal += item_data['quantity'] * unit_price
 
         # Create sale
@@ -139,7 +146,7 @@ class SaleCreateSerializer(serializers.ModelSerializer):
 
         # Create sale items and update stock
         for item_data in items_data:
-            product = Product.objects.get(pk=item_data['product_id'])
+            product = item_data['product']
             unit_price = item_data.get('unit_price', product.unit_price)
             quantity = item_data['quantity']
 
@@ -4,7 +4,7 @@ Serializers for Stock models.
 
 from rest_framework import serializers
 from .models import StockMovement
-from apps.products.models import Product
+from apps.products.identity import get_product_map
 
 
 class StockMovementSerializer(serializers.ModelSerializer):
@@ -36,12 +36,14 @@ class StockEntrySerializer(serializers.Serializer):
     expiration_date = serializers.DateField(required=False, allow_null=True)
 
     def validate_product_id(self, value):
-        try:
-            Product.objects.get(id=value, is_active=True)
-        except Product.DoesNotExist:
+        if get_product_map(self.context).get_active(value) is None:
             raise serializers.ValidationError("Produit non trouvé ou inactif.")
         return value
 
+    def validate(self, data):
+        data['product'] = get_product_map(self.context).get(data['product_id'])
+        return data
+
 
 class StockExitSerializer(serializers.Serializer):
     """Serializer for creating stock exits."""
@@ -50,18 +52,17 @@ class StockExitSerializer(serializers.Serializer):
     reason = serializers.CharField(max_length=255, required=False, default='')
 
     def validate_product_id(self, value):
-        try:
-            Product.objects.get(id=value, is_active=True)
-        except Product.DoesNotExist:
+        if get_product_map(self.context).get_active(value) is None:
             raise serializers.ValidationError("Produit non trouvé ou inactif.")
         return value
 
     def validate(self, data):
-        product = Product.objects.get(id=data['product_id'])
+        product = get_product_map(self.context).get(data['product_id'])
         if product.stock_quantity < data['quantity']:
             raise serializers.ValidationError({
                 'quantity': f"Stock insuffisant. Disponible: {product.stock_quantity}"
             })
+        data['product'] = product
         return data
 
 
@@ -72,8 +73,10 @@ class StockAdjustmentSerializer(serializers.Serializer):
     reason = serializers.CharField(max_length=255)
 
     def validate_product_id(self, value):
-        try:
-            Product.objects.get(id=value, is_active=True)
-        except Product.DoesNotExist:
+        if get_product_map(self.context).get_active(value) is None:
             raise serializers.ValidationError("Produit non trouvé ou inactif.")
         return value
+
+    def validate(self, data):
+        data['product'] = get_product_map(self.context).get(data['product_id'])
+        return data
@@ -3,10 +3,26 @@ Stock management services.
 """
 
 from django.db import transaction
+from django.utils import timezone
 from .models import StockMovement
+from apps.audit.context import get_current_context
 from apps.products.models import Product
 
 
+def delivered_by(order, user=None):
+    """
+    User the stock movements of a delivery are attributed to.
+
+    The user marking the order delivered (given, or the user of the
+    current request), or the order's creator when nobody is acting
+    (background jobs, shell).
+    """
+    if user is None:
+        context = get_current_context()
+        user = context.user if context is not None else None
+    return user or order.created_by
+
+
 @transaction.atomic
 def create_stock_entry(product, quantity, user, reason=''):
     """
@@ -162,3 +178,74 @@ def decrement_stock_for_order(order, user):
             create_low_stock_notification(product)
 
     return movements
+
+
+@transaction.atomic
+def decrement_stock_for_orders(orders, user):
+    """
+    Decrement stock for the items of several delivered orders at once.
+
+    Quantities are summed per product across all the orders and written
+    with a single bulk update of the products; one movement per order
+    item is still recorded, with bulk inserts. Stock levels are published
+    and low stock alerts raised once per product.
+
+    Args:
+        orders: Order instances marked as delivered
+        user: User who triggered the delivery (see delivered_by)
+
+    Returns:
+        List of StockMovement instances
+    """
+    from apps.orders.models import OrderItem
+
+    orders_by_id = {order.pk: order for order in orders}
+    items = list(
+        OrderItem.objects.filter(order_id__in=orders_by_id)
+        .order_by('order_id', 'id')
+        .values_list('order_id', 'product_id', 'quantity')
+    )
+    if not items:
+        return []
+
+    products = Product.objects.select_for_update().in_bulk(
+        sorted({product_id for _, product_id, _ in items})
+    )
+    movements = []
+    last_movements = {}
+    for order_id, product_id, quantity in items:
+        product = products[product_id]
+        order = orders_by_id[order_id]
+        previous_qty = product.stock_quantity
+        product.stock_quantity = previous_qty - quantity
+        movement = StockMovement(
+            product=product,
+            movement_type=StockMovement.MovementType.SORTIE,
+            quantity=-quantity,
+            previous_quantity=previous_qty,
+            new_quantity=product.stock_quantity,
+            order=order,
+            user=delivered_by(order, user),
+            reason=f'Livraison commande {order.order_number}'
+        )
+        movements.append(movement)
+        last_movements[product_id] = movement
+
+    # Audited through AuditedManager.bulk_update (one entry per product)
+    now = timezone.now()
+    for product in products.values():
+        product.refresh_derived_fields()
+        product.updated_at = now
+    Product.objects.bulk_update(
+        list(products.values()), ['stock_quantity', 'stock_state', 'updated_at'], batch_size=500
+    )
+    StockMovement.objects.bulk_create(movements, batch_size=500)
+
+    # bulk_create() sends no post_save: publish each product's final level
+    from apps.notifications.services import create_low_stock_notification, send_stock_updates
+    send_stock_updates(last_movements.values())
+    for product in products.values():
+        if product.is_low_stock:
+            create_low_stock_notification(product)
+
+    return movements
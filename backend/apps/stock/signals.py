@@ -0,0 +1,17 @@
+"""
+Signals for StockMovement model.
+Publishes new stock levels to WebSocket clients.
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import StockMovement
+
+
+@receiver(post_save, sender=StockMovement)
+def publish_stock_update(sender, instance, created, **kwargs):
+    """Publish the product's new stock level on the stock_alert channel."""
+    from apps.notifications.services import send_stock_update
+
+    if created:
+        send_stock_update(instance)
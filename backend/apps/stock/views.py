@@ -56,7 +56,7 @@ class StockEntryView(APIView):
         serializer = StockEntrySerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        product = Product.objects.get(id=serializer.validated_data['product_id'])
+        product = serializer.validated_data['product']
 
         # Update expiration date if provided
         expiration_date = serializer.validated_data.get('expiration_date')
@@ -85,7 +85,7 @@ class StockExitView(APIView):
         serializer = StockExitSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        product = Product.objects.get(id=serializer.validated_data['product_id'])
+        product = serializer.validated_data['product']
         movement = create_stock_exit(
             product=product,
             quantity=serializer.validated_data['quantity'],
@@ -107,7 +107,7 @@ class StockAdjustmentView(APIView):
         serializer = StockAdjustmentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        product = Product.objects.get(id=serializer.validated_data['product_id'])
+        product = serializer.validated_data['product']
         movement = create_stock_adjustment(
             product=product,
             new_quantity=serializer.validated_data['new_quantity'],
@@ -130,7 +130,6 @@ class StockAlertsView(APIView):
     permission_classes = [IsAuthenticated]  # Lecture pour tous les authentifiés
 
     def get(self, request):
-        from django.db.models import F
         from django.utils import timezone
         from datetime import timedelta
         from apps.products.serializers import ProductListSerializer
@@ -138,7 +137,7 @@ class StockAlertsView(APIView):
         # Low stock products
         low_stock = Product.objects.filter(
             is_active=True,
-            stock_quantity__lte=F('min_stock_level')
+            stock_state__in=[Product.StockState.LOW, Product.StockState.OUT]
         )
 
         # Expiring products (within 7 days)
@@ -152,7 +151,7 @@ class StockAlertsView(APIView):
         # Out of stock products
         out_of_stock = Product.objects.filter(
             is_active=True,
-            stock_quantity__lte=0
+            stock_state=Product.StockState.OUT
         )
 
         return Response({
@@ -5,3 +5,6 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = 'Utilisateurs'
+
+    def ready(self):
+        import apps.users.signals  # noqa
@@ -0,0 +1,95 @@
+"""
+JWT authentication with cached user resolution.
+
+Every REST request and WebSocket connect resolves the user of its access
+token. Users are cached for AUTH_USER_CACHE_TIMEOUT seconds and dropped
+from the cache whenever they are saved or deleted (see signals.py), so a
+reconnect storm does not turn into one users query per client, while role
+changes and deactivations still apply immediately.
+
+Only the fields permission checks and display need are cached (never the
+password hash); the user is rebuilt from them with the other fields
+deferred, loaded from the database if something reads them.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+# User fields kept in the cache
+CACHED_FIELDS = ('id', 'username', 'first_name', 'last_name', 'role', 'is_active')
+
+
+def _user_cache_key(user_id):
+    return f'auth:user_fields:{user_id}'
+
+
+def _user_from_fields(values):
+    """User instance from cached field values, the other fields deferred."""
+    User = get_user_model()
+    # from_db() expects the loaded fields in model order
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db('default', names, [values[name] for name in names])
+
+
+def get_cached_user(user_id):
+    """
+    Return the user with the given id, from the cache when possible.
+
+    Returns:
+        User instance, or None if it does not exist
+    """
+    key = _user_cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        User = get_user_model()
+        values = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values(*CACHED_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, USER_CACHE_TIMEOUT)
+    return _user_from_fields(values)
+
+
+def invalidate_user(user_id):
+    """Drop a user from the cache, e.g. after a role change."""
+    cache.delete(_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication resolving users through get_cached_user."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            ) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Not cached: reading the password loads it from the database
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
+
@@ -5,7 +5,11 @@ User model with role-based access control for Gapal.
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from apps.audit.tracking import audited
 
+
+# Keeps Django's UserManager: bulk update() on users is not captured
+@audited(exclude=['last_login', 'created_at', 'updated_at'], masked=['password'])
 class User(AbstractUser):
     """
     Custom User model with roles for the dairy management system.
@@ -1,5 +1,8 @@
 """
 Custom permissions for role-based access control.
+
+request.user comes from CachedJWTAuthentication, so these checks do not
+query the database.
 """
 
 from rest_framework import permissions
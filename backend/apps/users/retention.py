@@ -0,0 +1,16 @@
+"""
+Retention policies for JWT refresh tokens (see utils/retention.py).
+
+Every refresh rotation stores an outstanding token and blacklists the
+previous one. Once a token has expired it can no longer be used, so its
+rows (and its blacklist entry, deleted in cascade) are useless.
+"""
+
+from utils.retention import RetentionPolicy, register
+
+register(RetentionPolicy(
+    'expired_tokens',
+    'token_blacklist.OutstandingToken',
+    'expires_at',
+    days=0
+))
@@ -0,0 +1,16 @@
+"""
+Signals for User model.
+Keeps the authentication cache in sync with the users table.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User
+from .authentication import invalidate_user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the user from the cache after any change (role, active flag...)."""
+    invalidate_user(instance.pk)
@@ -97,7 +97,8 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user only holds the cached auth fields
+        return User.objects.get(pk=self.request.user.pk)
 
 
 class ChangePasswordView(generics.UpdateAPIView):
@@ -108,7 +109,7 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return User.objects.get(pk=self.request.user.pk)
 
     def update(self, request, *args, **kwargs):
         user = self.get_object()
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     # Third party
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'channels',
     'django_filters',
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     'apps.notifications',
     'apps.audit',
     'apps.sales',
+    'apps.clients',
 ]
 
 MIDDLEWARE = [
@@ -100,7 +102,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -125,6 +127,9 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Users resolved from JWT tokens are cached (invalidated on save/delete)
+AUTH_USER_CACHE_TIMEOUT = 60  # seconds
+
 # Channels configuration
 REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
@@ -134,10 +139,104 @@ CHANNEL_LAYERS = {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
             "hosts": [(REDIS_HOST, REDIS_PORT)],
+            # Bound what a slow consumer can pile up in Redis; dropped
+            # events are detected by sequence gaps and replayed
+            "capacity": 200,
+            "expiry": 60,
         },
     },
 }
 
+# Cache (unread counters, ...)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/1',
+        'KEY_PREFIX': 'gapal',
+    },
+}
+
+# Single-host deployments can run without Redis:
+# CHANNEL_LAYER_BACKEND=sqlite shares channels between local processes,
+# and the cache (replay buffer, unread counters, catalogue version...)
+# moves to the database (`manage.py createcachetable`), or to files with
+# CACHE_BACKEND=file
+if os.environ.get('CHANNEL_LAYER_BACKEND') == 'sqlite':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'utils.channel_layers.SQLiteChannelLayer',
+            'CONFIG': {
+                'path': os.environ.get('CHANNEL_LAYER_PATH', str(BASE_DIR / 'channels.sqlite3')),
+                'capacity': 200,
+                'expiry': 60,
+            },
+        },
+    }
+    if os.environ.get('CACHE_BACKEND') == 'file':
+        CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.environ.get('CACHE_PATH', str(BASE_DIR / 'cache' / 'django')),
+                'KEY_PREFIX': 'gapal',
+            },
+        }
+    else:
+        CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                'LOCATION': 'gapal_cache',
+                'KEY_PREFIX': 'gapal',
+            },
+        }
+
+
+# Notification outbox: WebSocket events are published after commit by a
+# background thread. Set NOTIFICATION_OUTBOX_AUTOSTART=false to publish
+# from a separate `manage.py dispatch_outbox` process instead.
+NOTIFICATION_OUTBOX_AUTOSTART = os.environ.get('NOTIFICATION_OUTBOX_AUTOSTART', 'true').lower() == 'true'
+NOTIFICATION_OUTBOX_BATCH_SIZE = 100
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 5
+NOTIFICATION_OUTBOX_RETRY_DELAY = 2  # seconds, doubled on each attempt
+NOTIFICATION_OUTBOX_POLL_INTERVAL = 5  # seconds
+NOTIFICATION_OUTBOX_CLAIM_TIMEOUT = 60  # seconds a claimed batch is hidden from other dispatchers
+NOTIFICATION_OUTBOX_COALESCE_WINDOW = 0.25  # seconds, bursts become batched frames
+
+# WebSocket replay: events kept per group for clients reconnecting
+NOTIFICATION_REPLAY_BUFFER_SIZE = 200
+NOTIFICATION_REPLAY_TIMEOUT = 24 * 3600  # seconds
+
+# Outbound frames buffered per WebSocket connection before a resync
+NOTIFICATION_WS_QUEUE_SIZE = 100
+
+# Audit log writer: entries are buffered and bulk inserted
+AUDIT_ASYNC = True
+AUDIT_BUFFER_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 2  # seconds
+AUDIT_RETENTION_DAYS = 365
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', str(BASE_DIR / 'archives' / 'audit'))
+
+# Catalogue snapshots served to the apps, cached per version on disk
+CATALOGUE_CACHE_DIR = os.environ.get('CATALOGUE_CACHE_DIR', str(BASE_DIR / 'cache' / 'catalogue'))
+
+# Barcodes resolved per process (POS scanning), LRU size
+BARCODE_CACHE_SIZE = 5000
+
+# Rows accepted by one bulk product import
+PRODUCT_IMPORT_MAX_ROWS = 10000
+
+# Orders accepted by one bulk status update
+ORDER_BULK_MAX_SIZE = 200
+
+# Data retention (manage.py purge_expired_data), days per policy
+RETENTION_DAYS = {
+    'notifications_read': 30,
+    'notifications': 90,
+    'expired_tokens': 0,
+    'catalogue_changes': 30,
+}
+RETENTION_BATCH_SIZE = 500
+RETENTION_BATCH_PAUSE = 0.1  # seconds between batches
+
 # CORS
 CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
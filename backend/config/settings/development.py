@@ -23,5 +23,12 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Local memory cache (per process)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # CORS - Allow all in development
 CORS_ALLOW_ALL_ORIGINS = True
@@ -18,6 +18,7 @@ urlpatterns = [
     path('api/notifications/', include('apps.notifications.urls')),
     path('api/audit/', include('apps.audit.urls')),
     path('api/sales/', include('apps.sales.urls')),
+    path('api/clients/', include('apps.clients.urls')),
 ]
 
 if settings.DEBUG:
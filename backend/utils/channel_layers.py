@@ -0,0 +1,332 @@
+"""
+SQLite channel layer for single-host deployments.
+
+Several daphne processes on the same machine share one SQLite database
+(WAL mode) instead of a Redis server. Supports groups, message expiry and
+per-channel capacity like channels_redis. Messages are stored as JSON, so
+they must be JSON serializable (all Gapal events are).
+
+Configuration:
+
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'utils.channel_layers.SQLiteChannelLayer',
+            'CONFIG': {
+                'path': '/var/lib/gapal/channels.sqlite3',
+                'expiry': 60,
+                'group_expiry': 86400,
+                'capacity': 100,
+            },
+        },
+    }
+
+Like channels_redis, channels created by `new_channel()` (one per
+consumer) are process-specific: a single receive loop per process polls
+the messages of all its channels with one read query, backing off from
+1ms up to `poll_interval` seconds while idle, takes the write lock only
+to delete the rows it found, and hands them to the waiting receivers.
+Sends from the same process wake the loop immediately. Other channels
+are polled by their receivers, also with a read before any write.
+`manage.py benchmark_channel_layer` compares the fan-out latency with
+Redis.
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import string
+import threading
+import time
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    body TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channel_messages_channel_idx ON channel_messages (channel, id);
+CREATE TABLE IF NOT EXISTS channel_groups (
+    group_name TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (group_name, channel)
+);
+"""
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    """Channel layer storing messages and groups in a shared SQLite file."""
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, path='channels.sqlite3', expiry=60, group_expiry=86400,
+                 capacity=100, channel_capacity=None, poll_interval=0.05,
+                 cleanup_interval=30):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.cleanup_interval = cleanup_interval
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self._local = threading.local()
+        self._schema_ready = False
+        self._last_cleanup = 0
+        # Process-specific channels are named '<client_prefix><name>!<id>'
+        self.client_prefix = 'sqlite.' + ''.join(random.choices(string.ascii_letters, k=12)) + '.'
+        self._loop = None
+        self._receive_task = None
+        self._wakeup = None
+        self._queues = {}
+        self._receivers = {}
+
+    # Database access (blocking, always run in a worker thread)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            if not self._schema_ready:
+                connection.executescript(SCHEMA)
+                self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, function, *args):
+        """Run `function(connection, *args)` in one write transaction."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = function(connection, *args)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    async def _run(self, function, *args):
+        return await asyncio.to_thread(self._execute, function, *args)
+
+    def _cleanup(self, connection, now):
+        if now - self._last_cleanup < self.cleanup_interval:
+            return
+        self._last_cleanup = now
+        connection.execute('DELETE FROM channel_messages WHERE expires <= ?', (now,))
+        connection.execute('DELETE FROM channel_groups WHERE expires <= ?', (now,))
+
+    def _insert(self, connection, channels, body, strict):
+        """
+        Store one message for several channels, skipping full ones.
+
+        With `strict` a full channel raises ChannelFull instead (send()).
+        """
+        now = time.time()
+        self._cleanup(connection, now)
+        placeholders = ','.join('?' * len(channels))
+        sizes = dict(connection.execute(
+            f'SELECT channel, COUNT(*) FROM channel_messages '
+            f'WHERE channel IN ({placeholders}) AND expires > ? GROUP BY channel',
+            [*channels, now]
+        ).fetchall())
+
+        rows = []
+        for channel in channels:
+            if sizes.get(channel, 0) >= self.get_capacity(channel):
+                if strict:
+                    raise ChannelFull(channel)
+                continue
+            rows.append((channel, body, now + self.expiry))
+        connection.executemany(
+            'INSERT INTO channel_messages (channel, body, expires) VALUES (?, ?, ?)', rows
+        )
+
+    def _delete(self, connection, ids):
+        placeholders = ','.join('?' * len(ids))
+        return connection.execute(
+            f'DELETE FROM channel_messages WHERE id IN ({placeholders})', ids
+        ).rowcount
+
+    def _pop(self, channel):
+        """Next message of a shared channel, None when there is none."""
+        while True:
+            # Plain read first: idle polls never take the write lock
+            row = self._connection().execute(
+                'SELECT id, body FROM channel_messages WHERE channel = ? AND expires > ? '
+                'ORDER BY id LIMIT 1',
+                (channel, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            if self._execute(self._delete, [row[0]]):
+                return row[1]
+            # Taken by another receiver of the channel meanwhile
+
+    def _pop_local(self, limit=500):
+        """Messages of this process's channels, as (channel, expires, body)."""
+        rows = self._connection().execute(
+            'SELECT id, channel, body, expires FROM channel_messages '
+            'WHERE channel >= ? AND channel < ? ORDER BY id LIMIT ?',
+            # Channels sorting between '<client_prefix>' and the next prefix
+            (self.client_prefix, self.client_prefix[:-1] + '/', limit)
+        ).fetchall()
+        if not rows:
+            return []
+        self._execute(self._delete, [row[0] for row in rows])
+        return [(channel, expires, body) for _, channel, body, expires in rows]
+
+    # Per-process receive loop
+
+    def _is_local(self, channel):
+        return '!' in channel and channel.startswith(self.client_prefix)
+
+    def _ensure_receive_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or a new event loop (tests, management commands)
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._queues = {}
+            self._receivers = {}
+            self._receive_task = None
+        if self._receive_task is None or self._receive_task.done():
+            self._receive_task = loop.create_task(self._receive_loop())
+
+    def _wake(self):
+        """Wake the receive loop after a send from this process."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                wakeup.set()
+                return
+        except RuntimeError:
+            pass
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    async def _receive_loop(self):
+        delay = 0.001
+        last_sweep = time.time()
+        while True:
+            self._wakeup.clear()
+            messages = await asyncio.to_thread(self._pop_local)
+            for channel, expires, body in messages:
+                self._queues.setdefault(channel, asyncio.Queue()).put_nowait((expires, body))
+            if time.time() - last_sweep >= self.cleanup_interval:
+                last_sweep = time.time()
+                self._sweep_queues(last_sweep)
+            if messages:
+                delay = 0.001
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+                delay = 0.001
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, self.poll_interval)
+
+    def _sweep_queues(self, now):
+        """Drop the expired messages of channels nobody is receiving on."""
+        for channel in [name for name in self._queues if name not in self._receivers]:
+            queue = self._queues[channel]
+            items = [queue.get_nowait() for _ in range(queue.qsize())]
+            items = [item for item in items if item[0] > now]
+            if not items:
+                del self._queues[channel]
+            for item in items:
+                queue.put_nowait(item)
+
+    async def _receive_local(self, channel):
+        self._ensure_receive_loop()
+        queue = self._queues.setdefault(channel, asyncio.Queue())
+        self._receivers[channel] = self._receivers.get(channel, 0) + 1
+        try:
+            while True:
+                expires, body = await queue.get()
+                if expires > time.time():
+                    return json.loads(body)
+        finally:
+            self._receivers[channel] -= 1
+            if not self._receivers[channel]:
+                del self._receivers[channel]
+                if queue.empty() and self._queues.get(channel) is queue:
+                    del self._queues[channel]
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_channel_name(channel)
+        await self._run(self._insert, [channel], json.dumps(message), True)
+        if self._is_local(channel):
+            self._wake()
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        if self._is_local(channel):
+            return await self._receive_local(channel)
+        delay = 0.001
+        while True:
+            body = await asyncio.to_thread(self._pop, channel)
+            if body is not None:
+                return json.loads(body)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.poll_interval)
+
+    async def new_channel(self, prefix='specific'):
+        suffix = ''.join(random.choices(string.ascii_letters, k=12))
+        return f'{self.client_prefix}{prefix}!{suffix}'
+
+    async def flush(self):
+        def flush(connection):
+            connection.execute('DELETE FROM channel_messages')
+            connection.execute('DELETE FROM channel_groups')
+        await self._run(flush)
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+
+        def add(connection):
+            connection.execute(
+                'INSERT OR REPLACE INTO channel_groups (group_name, channel, expires) '
+                'VALUES (?, ?, ?)',
+                (group, channel, time.time() + self.group_expiry)
+            )
+        await self._run(add)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+
+        def discard(connection):
+            connection.execute(
+                'DELETE FROM channel_groups WHERE group_name = ? AND channel = ?',
+                (group, channel)
+            )
+        await self._run(discard)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_group_name(group)
+        body = json.dumps(message)
+
+        def send(connection):
+            channels = [row[0] for row in connection.execute(
+                'SELECT channel FROM channel_groups WHERE group_name = ? AND expires > ?',
+                (group, time.time())
+            )]
+            if channels:
+                # Like channels_redis, full channels silently miss the message
+                self._insert(connection, channels, body, False)
+            return any(self._is_local(channel) for channel in channels)
+        if await self._run(send):
+            self._wake()
@@ -0,0 +1,123 @@
+"""
+Declarative data retention.
+
+Apps declare what may be deleted in a `retention.py` module:
+
+    from utils.retention import RetentionPolicy, register
+
+    register(RetentionPolicy(
+        'notifications', 'notifications.Notification', 'created_at', days=90
+    ))
+
+A policy selects rows whose `age_field` is older than `days` (0 for
+expiry dates already in the past), optionally narrowed by a Q filter.
+The number of days can be overridden per policy in RETENTION_DAYS.
+
+`purge()` deletes the selected rows by primary key in batches of
+RETENTION_BATCH_SIZE, each in its own short transaction, pausing
+RETENTION_BATCH_PAUSE seconds between batches so locks are never held for
+long. Run by `manage.py purge_expired_data` (cron or systemd timer).
+"""
+
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+_policies = {}
+
+
+class RetentionPolicy:
+    """Rows of one model that may be deleted."""
+
+    def __init__(self, name, model, age_field, days, filter=None, after_purge=None):
+        self.name = name
+        self.model_label = model
+        self.age_field = age_field
+        self.default_days = days
+        self.filter = filter
+        self.after_purge = after_purge
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def days(self):
+        return getattr(settings, 'RETENTION_DAYS', {}).get(self.name, self.default_days)
+
+    def queryset(self, now=None):
+        cutoff = (now or timezone.now()) - timedelta(days=self.days)
+        queryset = self.model._base_manager.filter(**{f'{self.age_field}__lt': cutoff})
+        if self.filter is not None:
+            queryset = queryset.filter(self.filter)
+        return queryset
+
+
+class PurgeReport:
+    """Outcome of one policy run."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.deleted = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+
+def register(policy):
+    _policies[policy.name] = policy
+    return policy
+
+
+def get_policies(names=None):
+    """Registered policies, loading every app's retention module first."""
+    autodiscover_modules('retention')
+    if not names:
+        return list(_policies.values())
+    unknown = set(names) - set(_policies)
+    if unknown:
+        raise KeyError(', '.join(sorted(unknown)))
+    return [_policies[name] for name in names]
+
+
+def purge(policy, batch_size=None, pause=None, dry_run=False):
+    """
+    Delete the rows selected by a policy.
+
+    Returns:
+        PurgeReport (with dry_run, `deleted` is the number of rows selected)
+    """
+    batch_size = batch_size or getattr(settings, 'RETENTION_BATCH_SIZE', 500)
+    pause = getattr(settings, 'RETENTION_BATCH_PAUSE', 0.1) if pause is None else pause
+    report = PurgeReport(policy)
+    started = time.monotonic()
+    now = timezone.now()
+
+    if dry_run:
+        report.deleted = policy.queryset(now).values('pk').distinct().count()
+        report.seconds = time.monotonic() - started
+        return report
+
+    model = policy.model
+    while True:
+        ids = list(
+            policy.queryset(now).order_by('pk').values_list('pk', flat=True).distinct()[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            _, deleted = model._base_manager.filter(pk__in=ids).delete()
+        report.deleted += deleted.get(model._meta.label, 0)
+        report.batches += 1
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+
+    if report.deleted and policy.after_purge is not None:
+        policy.after_purge(report)
+    report.seconds = time.monotonic() - started
+    return report
@@ -0,0 +1,167 @@
+"""
+Normalized search keys and autocomplete helpers.
+
+Search keys are stored next to the searched columns (maintained on save):
+lowercase, without accents or punctuation, so "Crème" and "creme" match.
+Phone keys keep digits only, without the +226 country code.
+
+A query matches when each of its words is a prefix of a word of the key.
+On PostgreSQL this is a LIKE filter served by a pg_trgm GIN index; on
+SQLite (single-host deployments) an in-memory PrefixIndex is built per
+process and rebuilt when its data version changes.
+"""
+
+import re
+import threading
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+
+COUNTRY_CODE = '226'
+LOCAL_PHONE_LENGTH = 8
+
+# Results returned by autocomplete endpoints
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+
+_non_alnum = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(value):
+    """'  Crème fraîche-Entière ' -> 'creme fraiche entiere'."""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(c for c in value if not unicodedata.combining(c)).lower()
+    return _non_alnum.sub(' ', value).strip()
+
+
+def normalize_phone(value):
+    """'+226 70 12 34 56' -> '70123456'."""
+    digits = re.sub(r'\D', '', value or '')
+    if digits.startswith('00'):
+        digits = digits[2:]
+    if digits.startswith(COUNTRY_CODE) and len(digits) == len(COUNTRY_CODE) + LOCAL_PHONE_LENGTH:
+        digits = digits[len(COUNTRY_CODE):]
+    return digits
+
+
+def is_phone_query(query):
+    """Queries made of digits (and phone punctuation) search phone numbers."""
+    return bool(query) and re.fullmatch(r'[\d\s+().-]+', query) is not None \
+        and len(normalize_phone(query)) >= 2
+
+
+def parse_limit(value):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def use_database_index():
+    """Whether the database can serve word-prefix searches from an index."""
+    return connection.vendor == 'postgresql'
+
+
+def word_prefix_filter(field, query):
+    """Q matching rows whose `field` key has a word starting with each query word."""
+    condition = Q()
+    for word in normalize_text(query).split():
+        condition &= Q(**{f'{field}__startswith': word}) | Q(**{f'{field}__contains': f' {word}'})
+    return condition
+
+
+class PrefixIndex:
+    """
+    In-memory word-prefix index.
+
+    Every prefix of every word of an item's key maps to the item, so a
+    lookup is one dict access per query word.
+    """
+
+    def __init__(self):
+        self._prefixes = {}
+        self._keys = {}
+        self._weights = {}
+
+    def add(self, item, key, weight=0):
+        self._keys[item] = key
+        self._weights[item] = weight
+        for word in key.split():
+            for end in range(1, len(word) + 1):
+                self._prefixes.setdefault(word[:end], set()).add(item)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Items matching every query word, best ranked first."""
+        words = query.split()
+        if not words:
+            return []
+        matches = None
+        for word in words:
+            items = self._prefixes.get(word, set())
+            matches = items if matches is None else matches & items
+            if not matches:
+                return []
+        return sorted(matches, key=lambda item: rank(self._keys[item], query, self._weights[item]))[:limit]
+
+
+def rank(key, query, weight=0):
+    """Sort key: whole key starting with the query first, then by weight."""
+    return (not key.startswith(query), -weight, key)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_prefix_index(name, version, build):
+    """
+    Per-process PrefixIndex `name`, rebuilt by `build()` when `version`
+    differs from the one it was built for.
+    """
+    cached = _indexes.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _indexes_lock:
+        cached = _indexes.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, build())
+            _indexes[name] = cached
+    return cached[1]
+
+
+def postgres_search_indexes(table, trigram_columns=(), prefix_columns=()):
+    """
+    Migration operation creating the search indexes on PostgreSQL only:
+    trigram GIN indexes (word-prefix LIKE '%...%' filters) and
+    varchar_pattern_ops indexes (LIKE '...%' filters). SQLite uses the
+    in-memory PrefixIndex instead.
+    """
+    from django.db import migrations
+
+    indexes = [
+        (f'{table}_{column}_trgm', f'USING gin ({column} gin_trgm_ops)')
+        for column in trigram_columns
+    ] + [
+        (f'{table}_{column}_prefix', f'({column} varchar_pattern_ops)')
+        for column in prefix_columns
+    ]
+
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        if trigram_columns:
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, definition in indexes:
+            schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}')
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for name, _ in indexes:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+    return migrations.RunPython(create, drop)
@@ -102,7 +102,7 @@ export default function OrdersPage() {
 
       return api.getOrders(params);
     },
-    refetchInterval: 30000, // Poll every 30 seconds as fallback
+    refetchInterval: 300000, // Slow fallback poll: changes arrive as order_update deltas
   });
 
   const { data: stats } = useQuery({
@@ -119,16 +119,44 @@ export default function OrdersPage() {
           'Nouvelle commande',
           data.message || `Commande ${data.order_number || ''} reçue`
         );
-        // Rafraîchir la liste et les stats
-        refetch();
+        // La liste est rafraîchie par l'événement order_update
         queryClient.invalidateQueries({ queryKey: ['orderStats'] });
-      } else if (data.type === 'order_status' || data.type === 'order_delivered') {
+      }
+    });
+
+    // Order deltas: patch the cached pages in place instead of re-fetching.
+    // New orders may land on another page, so they still trigger a refetch.
+    const unsubscribeUpdates = wsClient.on('order_update', (delta) => {
+      if (!delta?.id) return;
+      if (delta.action === 'created') {
         refetch();
+      } else {
+        queryClient.setQueriesData({ queryKey: ['orders'] }, (old: any) => {
+          if (!old?.results) return old;
+          return {
+            ...old,
+            results: old.results.map((order: any) =>
+              order.id === delta.id ? { ...order, ...delta.changes } : order
+            ),
+          };
+        });
+      }
+      if ('delivery_status' in delta.changes || 'payment_status' in delta.changes) {
         queryClient.invalidateQueries({ queryKey: ['orderStats'] });
       }
     });
 
-    return () => unsubscribe();
+    // Events were missed and cannot be replayed: reload everything
+    const unsubscribeResync = wsClient.on('resync_required', () => {
+      refetch();
+      queryClient.invalidateQueries({ queryKey: ['orderStats'] });
+    });
+
+    return () => {
+      unsubscribe();
+      unsubscribeUpdates();
+      unsubscribeResync();
+    };
   }, [refetch, toast, queryClient]);
 
   // Sorting function
@@ -9,6 +9,11 @@ class WebSocketClient {
   private reconnectTimeout: NodeJS.Timeout | null = null;
   private handlers: Map<string, MessageHandler[]> = new Map();
   private isConnecting = false;
+  // Last sequence number received per server group, sent back on
+  // reconnect so the server replays the events missed in between.
+  private lastSeq: Record<string, number> = {};
+  // Topic subscriptions (e.g. "orders.priority:haute"), restored on reconnect
+  private topics: Set<string> = new Set();
 
   connect(): void {
     if (this.ws?.readyState === WebSocket.OPEN || this.isConnecting) {
@@ -22,17 +27,40 @@ class WebSocketClient {
 
     this.isConnecting = true;
     const wsUrl = process.env.NEXT_PUBLIC_WS_URL || 'ws://localhost:8000';
-    this.ws = new WebSocket(`${wsUrl}/ws/notifications/?token=${token}`);
+    const lastSeq = Object.entries(this.lastSeq)
+      .map(([group, seq]) => `${group}:${seq}`)
+      .join(',');
+    const resume = lastSeq ? `&last_seq=${encodeURIComponent(lastSeq)}` : '';
+    this.ws = new WebSocket(`${wsUrl}/ws/notifications/?token=${token}${resume}`);
 
     this.ws.onopen = () => {
       console.log('WebSocket connected');
       this.isConnecting = false;
+      if (this.topics.size > 0) {
+        this.send({ action: 'subscribe', topics: Array.from(this.topics) });
+      }
       this.emit('connected', {});
     };
 
     this.ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
+        if (data.type === 'init' && data.seq) {
+          // Keep our own positions on reconnect: the server replays from
+          // them, or answers with resync_required
+          this.lastSeq = { ...data.seq, ...this.lastSeq };
+        } else if (data.type === 'resync_required' && data.group && typeof data.seq === 'number') {
+          // The data is refetched: restart from the server's position
+          this.lastSeq[data.group] = data.seq;
+        } else if (data.group && typeof data.seq === 'number') {
+          this.lastSeq[data.group] = Math.max(this.lastSeq[data.group] ?? 0, data.seq);
+        }
+        // Coalesced frames (e.g. "notification_batch") carry a list of
+        // payloads: deliver each one to the regular handlers too.
+        if (data.type?.endsWith('_batch') && Array.isArray(data.data)) {
+          const itemType = data.type.slice(0, -'_batch'.length);
+          data.data.forEach((item: any) => this.emit(itemType, item));
+        }
         this.emit(data.type, data.data || data);
       } catch (e) {
         console.error('WebSocket message parse error:', e);
@@ -101,6 +129,20 @@ class WebSocketClient {
   markAllRead(): void {
     this.send({ action: 'mark_all_read' });
   }
+
+  subscribe(topics: string[]): void {
+    topics.forEach((topic) => this.topics.add(topic));
+    this.send({ action: 'subscribe', topics });
+  }
+
+  unsubscribe(topics?: string[]): void {
+    if (topics) {
+      topics.forEach((topic) => this.topics.delete(topic));
+    } else {
+      this.topics.clear();
+    }
+    this.send({ action: 'unsubscribe', topics });
+  }
 }
 
 export const wsClient = new WebSocketClient();